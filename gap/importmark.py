@@ -0,0 +1,33 @@
+import sys
+import subprocess
+from time import time
+from statistics import mean, median
+
+# Each round imports pygraphblas in a fresh interpreter, "eager" also
+# creates every builtin operator like older versions did at import.
+programs = {
+    'baseline': 'pass',
+    'import': 'import pygraphblas',
+    'first use': 'from pygraphblas import *; INT64.PLUS_TIMES; FP64.MIN_PLUS',
+    'eager': 'import pygraphblas as gb; gb.semiring.build_semirings(); '
+             'gb.binaryop.build_binaryops(); gb.unaryop.build_unaryops(); '
+             'gb.monoid.build_monoids()',
+}
+
+def timeit(program, rounds):
+    timings = []
+    for i in range(rounds):
+        start = time()
+        subprocess.run([sys.executable, '-c', program], check=True)
+        timings.append(time() - start)
+    return timings
+
+if __name__ == '__main__':
+    argc = len(sys.argv)
+
+    rounds = int(sys.argv[1]) if argc > 1 else 16
+
+    for name, program in programs.items():
+        timings = timeit(program, rounds)
+        print('{} mean {:.4f} median {:.4f} min {:.4f} for {} rounds'.format(
+            name, mean(timings), median(timings), min(timings), rounds))
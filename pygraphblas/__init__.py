@@ -5,15 +5,9 @@ lib.LAGraph_init()
 from .matrix import Matrix
 from .vector import Vector
 from .scalar import Scalar
-from .semiring import build_semirings
-from .binaryop import build_binaryops
-from .unaryop import build_unaryops
-from .monoid import build_monoids
 
-build_semirings()
-build_binaryops()
-build_unaryops()
-build_monoids()
+# semirings and operators are created on first access, see the module
+# __getattr__ of semiring, binaryop, unaryop and monoid.
 
 from .types import *
 from .semiring import *
@@ -21,4 +15,5 @@ from .binaryop import *
 from .unaryop import *
 from .monoid import *
 from .descriptor import *
+from .expr import *
 from .utils import *
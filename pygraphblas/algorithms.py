@@ -0,0 +1,387 @@
+"""Graph algorithms.
+
+Graphs are given by their adjacency matrix `A`, where `A[i, j]` is
+the edge from vertex i to vertex j.  Results are returned as Vectors
+indexed by vertex, or as matrices with one such row per source.
+
+"""
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from .base import options_get
+from .matrix import Matrix
+from .vector import Vector
+from .types import BOOL, INT64, FP64
+from .descriptor import R, S, RC, RS, RSC, TransposeA
+
+__all__ = [
+    "bfs",
+    "sssp",
+    "multi_source_bfs",
+    "multi_source_sssp",
+    "pagerank",
+    "betweenness_centrality",
+]
+
+
+def bfs(A, source, AT=None, parents=False, alpha=14.0, beta=24.0):
+    """Breadth-first search of the graph `A` from the vertex `source`.
+
+    Returns `(levels, parents)`, two INT64 Vectors holding the depth
+    of every vertex reached, 0 for `source`, and its parent in the
+    search tree, `source` being its own parent.  `parents` is None
+    unless it is asked for.
+
+    Each level is expanded by pushing the frontier through the rows
+    of `A` with `vxm`, or by pulling it into the unvisited vertices
+    with `mxv` on the transpose `AT`, both masked with the complement
+    of the visited vertices.  Pulling starts when the edges out of a
+    growing frontier exceed 1/`alpha` of the edges of the unvisited
+    vertices, and pushing starts again when a shrinking frontier is
+    smaller than 1/`beta` of the vertices, see Beamer et al.,
+    "Direction-Optimizing Breadth-First Search" (2012).  `AT` is
+    computed on the first pull if it isn't given.
+
+    """
+    n = A.nrows
+    if parents:
+        q = Vector.sparse(INT64, n)
+        q[source] = source
+        push_semiring, pull_semiring = INT64.ANY_FIRST, INT64.ANY_SECOND
+        parents = Vector.sparse(INT64, n)
+    else:
+        q = Vector.sparse(BOOL, n)
+        q[source] = True
+        push_semiring = pull_semiring = BOOL.ANY_PAIR
+        parents = None
+    levels = Vector.sparse(INT64, n)
+
+    degrees = A.row_degrees()
+    unvisited_edges = int(degrees.sum())
+    push = True
+    nq = 0
+    depth = 0
+    while q.nvals:
+        levels.assign_scalar(depth, mask=q, desc=S)
+        if parents is not None:
+            parents.assign(q, mask=q, desc=S)
+        I, _ = q.to_numpy(vals=False)
+        growing = len(I) > nq
+        nq = len(I)
+        frontier_edges = int(degrees[I].sum())
+        unvisited_edges -= frontier_edges
+        if push:
+            push = not (growing and frontier_edges > unvisited_edges / alpha)
+        else:
+            push = not growing and nq < n / beta
+        if parents is not None:
+            # the frontier values are the parents of the next level
+            q.clear()
+            q.build(I, I)
+        if push:
+            q.vxm(A, out=q, mask=levels, semiring=push_semiring, desc=RSC)
+        else:
+            if AT is None:
+                AT = A.transpose()
+            AT.mxv(q, out=q, mask=levels, semiring=pull_semiring, desc=RSC)
+        depth += 1
+    return levels, parents
+
+
+def _frontier(typ, sources, n, value):
+    # a len(sources) by n matrix holding `value` at (k, sources[k])
+    F = Matrix.sparse(typ, len(sources), n)
+    F.build(np.arange(len(sources)), sources, np.full(len(sources), value))
+    return F
+
+
+def _batches(sources, batch):
+    sources = np.asarray(sources, dtype=np.int64)
+    for start in range(0, len(sources), batch):
+        batch_sources = sources[start : start + batch]
+        yield slice(start, start + len(batch_sources) - 1), batch_sources
+
+
+def multi_source_bfs(A, sources, batch=64):
+    """Breadth-first searches of the graph `A` from every vertex in
+    `sources`.
+
+    Returns a `len(sources)` by n INT64 Matrix whose row k holds the
+    depth of every vertex reached from `sources[k]`.  The searches are
+    run `batch` at a time, the frontiers of a batch are the rows of
+    one matrix expanded with a single `mxm` per level, masked with the
+    complement of the vertices each source has visited.
+
+    """
+    n = A.nrows
+    result = Matrix.sparse(INT64, len(sources), n)
+    for rows, batch_sources in _batches(sources, batch):
+        F = _frontier(BOOL, batch_sources, n, True)
+        levels = Matrix.sparse(INT64, len(batch_sources), n)
+        depth = 0
+        while F.nvals:
+            levels.assign_scalar(depth, mask=F, desc=S)
+            F.mxm(A, out=F, mask=levels, semiring=BOOL.ANY_PAIR, desc=RSC)
+            depth += 1
+        result.assign_matrix(levels, rows)
+    return result
+
+
+def multi_source_sssp(A, sources, batch=64):
+    """Shortest path lengths in the graph `A`, whose values are the
+    edge weights, from every vertex in `sources`.
+
+    Returns a `len(sources)` by n Matrix of the type of `A`, INT64 hop
+    counts for a BOOL matrix, whose row k holds the distance of every
+    vertex reached from `sources[k]`.  The sources are run `batch` at
+    a time as Bellman-Ford relaxations, each step is a single `mxm`
+    with the `MIN_PLUS` semiring of the rows whose distances changed
+    in the previous step, masked to the distances it improves.  A
+    negative cycle reachable from a source raises `ValueError`.
+
+    """
+    n = A.nrows
+    typ = INT64 if A.type == BOOL else A.type
+    result = Matrix.sparse(typ, len(sources), n)
+    for rows, batch_sources in _batches(sources, batch):
+        ns = len(batch_sources)
+        D = _frontier(typ, batch_sources, n, 0)
+        F = D.dup()
+        T = Matrix.sparse(typ, ns, n)
+        worse = Matrix.sparse(BOOL, ns, n)
+        for step in range(n + 1):
+            if not F.nvals:
+                break
+            F.mxm(A, out=T, semiring=typ.MIN_PLUS, desc=R)
+            T.emult(D, typ.GE, out=worse, desc=R)
+            T.apply(typ.IDENTITY, out=F, mask=worse, desc=RC)
+            D.assign_matrix(F, mask=F, desc=S)
+        else:
+            raise ValueError("Negative cycle reachable from a source.")
+        result.assign_matrix(D, rows)
+    return result
+
+
+def sssp(A, source, delta=None):
+    """Shortest path lengths in the graph `A`, whose values are the
+    non negative edge weights, from the vertex `source`.
+
+    Returns a Vector of the distance of every vertex reached, of the
+    type of `A`, INT64 hop counts for a BOOL matrix.  Distances are
+    found by delta-stepping, see Sridhar et al., "Delta-Stepping SSSP:
+    From Vertices and Edges to GraphBLAS Implementations" (2019).
+    Edges are split with `select` into light edges, no heavier than
+    `delta`, and heavy ones.  The vertices whose tentative distance is
+    in [i*delta, (i+1)*delta) form bucket i, which is settled by
+    relaxing its light edges until it stops changing, masked to the
+    distances each step improves, then the heavy edges of everything
+    the bucket reached are relaxed once.  `delta` defaults to the
+    mean edge weight.
+
+    """
+    if A.type == BOOL:
+        A = A.pattern(INT64)
+    typ = A.type
+    n = A.nrows
+    if A.select("<", 0).nvals:
+        raise ValueError("Edge weights must not be negative.")
+    if delta is None:
+        delta = A.reduce_float() / max(A.nvals, 1) or 1
+    light = A.select("<=", delta)
+    heavy = A.select(">", delta)
+
+    t = Vector.sparse(typ, n)
+    t[source] = 0
+    unsettled = Vector.sparse(typ, n)
+    bucket = Vector.sparse(typ, n)
+    reached = Vector.sparse(BOOL, n)
+    requests = Vector.sparse(typ, n)
+    worse = Vector.sparse(BOOL, n)
+    improved = Vector.sparse(typ, n)
+
+    def relax(frontier, edges):
+        # t = min(t, frontier min.+ edges), leaving the entries of t
+        # that improved in `improved`
+        requests.clear()
+        frontier.vxm(edges, out=requests, semiring=typ.MIN_PLUS)
+        requests.emult(t, typ.GE, out=worse, desc=R)
+        requests.apply(typ.IDENTITY, out=improved, mask=worse, desc=RC)
+        t.assign(improved, mask=improved, desc=S)
+
+    i = 0
+    while True:
+        t.select(">=", i * delta, out=unsettled, desc=R)
+        if not unsettled.nvals:
+            break
+        unsettled.select("<", (i + 1) * delta, out=bucket, desc=R)
+        if not bucket.nvals:
+            # skip the empty buckets, staying one below the bucket of
+            # the nearest unsettled vertex in case of rounding
+            nearest = unsettled.reduce_float(typ.MIN_MONOID)
+            i = max(i + 1, int(nearest // delta) - 1)
+            continue
+        reached.clear()
+        while bucket.nvals:
+            reached.assign_scalar(True, mask=bucket, desc=S)
+            relax(bucket, light)
+            improved.select("<", (i + 1) * delta, out=bucket, desc=R)
+        t.apply(typ.IDENTITY, out=bucket, mask=reached, desc=RS)
+        relax(bucket, heavy)
+        i += 1
+    return t
+
+
+def pagerank(
+    A, damping=0.85, tol=1e-4, itermax=100, out_degree=None, teleport=None, typ=FP64,
+):
+    """PageRank of the vertices of the graph `A`.
+
+    Returns `(ranks, iterations, residual)`, the ranks as a Vector of
+    `typ` summing to 1, the number of iterations run and the 1-norm of
+    the change of the ranks in the last one, which is below `tol`
+    unless `itermax` iterations were reached.
+
+    `out_degree` is the number of out edges of each vertex, computed
+    from `A` if it isn't given, vertices with no out edges are
+    dangling.  The random surfer jumps with probability 1 - `damping`,
+    and from dangling vertices always, to a vertex drawn from
+    `teleport`, a Vector of weights normalized to sum to 1, or
+    uniformly if it's None.
+
+    All work vectors are created before iterating and every step
+    writes into them with `out=` and `accum=`, so an iteration only
+    runs GraphBLAS operations.
+
+    """
+    n = A.nrows
+    if out_degree is None:
+        out_degree = A.mxv(
+            Vector.dense(BOOL, A.ncols, True), cast=typ, semiring=typ.PLUS_PAIR
+        )
+    # the degrees divided by the damping factor, without the zeros
+    scaled_degree = Vector.sparse(typ, n)
+    out_degree.apply(typ.IDENTITY, out=scaled_degree, mask=out_degree, desc=R)
+    scaled_degree.apply_second(typ.DIV, damping, out=scaled_degree)
+    p = None
+    if teleport is not None:
+        p = Vector.sparse(typ, n)
+        teleport.apply(typ.IDENTITY, out=p)
+        p.apply_second(typ.DIV, p.reduce_float(), out=p)
+
+    r = Vector.sparse(typ, n)
+    t = Vector.sparse(typ, n)
+    w = Vector.sparse(typ, n)
+    if p is None:
+        r.assign_scalar(1.0 / n)
+    else:
+        p.apply(typ.IDENTITY, out=r)
+
+    residual = float("inf")
+    iterations = 0
+    while iterations < itermax and residual > tol:
+        # rank of the dangling vertices
+        r.apply(typ.IDENTITY, out=t, mask=scaled_degree, desc=RSC)
+        jump = 1.0 - damping + damping * t.reduce_float()
+        # t = jump * p + A' (damping * r / out_degree)
+        r.emult(scaled_degree, typ.DIV, out=w)
+        if p is None:
+            t.assign_scalar(jump / n)
+        else:
+            p.apply_second(typ.TIMES, jump, out=t)
+        A.mxv(w, out=t, accum=typ.PLUS, semiring=typ.PLUS_SECOND, desc=TransposeA)
+        # residual = |t - r|, then t holds the ranks
+        t.eadd(r, typ.MINUS, out=r)
+        r.apply(typ.ABS, out=r)
+        residual = r.reduce_float()
+        r, t = t, r
+        iterations += 1
+    return r, iterations, residual
+
+
+def _narrow(A, bound):
+    # A as the narrowest unsigned integer type holding values below bound
+    return A.astype(np.min_scalar_type(max(bound - 1, 0)), copy=False)
+
+
+def _brandes(A, AT, sources, typ):
+    # the dependencies of every vertex on the batch of `sources`
+    ns = len(sources)
+    n = A.nrows
+    paths = _frontier(typ, sources, n, 1)
+    F = paths.dup()
+    levels = []
+    while True:
+        F.mxm(A, out=F, mask=paths, semiring=typ.PLUS_FIRST, desc=RSC)
+        if not F.nvals:
+            break
+        I, J, _ = F.to_numpy(vals=False)
+        levels.append((_narrow(I, ns), _narrow(J, n)))
+        paths.assign_matrix(F, mask=F, desc=S)
+
+    # bc = 1 + dependency, summed from the deepest level up
+    bc = Matrix.sparse(typ, ns, n)
+    bc.assign_scalar(1, mask=paths, desc=S)
+    W = Matrix.sparse(typ, ns, n)
+    above = Matrix.sparse(BOOL, ns, n)
+    below = Matrix.sparse(BOOL, ns, n)
+    if levels:
+        I, J = levels.pop()
+        above.build(I, J, np.ones(len(I), np.bool_))
+    while levels:
+        I, J = levels.pop()
+        below.clear()
+        below.build(I, J, np.ones(len(I), np.bool_))
+        bc.emult(paths, typ.DIV, out=W, mask=above, desc=RS)
+        W.mxm(AT, out=W, mask=below, semiring=typ.PLUS_FIRST, desc=RS)
+        W.emult(paths, typ.TIMES, out=bc, accum=typ.PLUS)
+        above, below = below, above
+    bc.apply_second(typ.MINUS, 1, out=bc)
+    return bc.reduce_vector(out=Vector.sparse(typ, n), desc=TransposeA)
+
+
+def betweenness_centrality(A, sources, batch=64, AT=None, typ=FP64, nthreads=None):
+    """Betweenness centrality of the vertices of the graph `A`, from
+    the shortest paths starting at `sources`, every vertex for the
+    exact centrality.
+
+    Returns a Vector of `typ` with an entry for every vertex, FP32
+    halves the memory of the path counts at the cost of precision.
+    The sources are run `batch` at a time with Brandes' algorithm as
+    in Bader et al., "Betweenness Centrality in the GraphBLAS": a
+    breadth-first search counts the shortest paths from each source
+    with one `mxm` per level, then the dependencies are pushed back
+    up through the transpose `AT`, computed if it isn't given.
+
+    The vertices reached at each level are kept as their row and
+    column indices in the narrowest integer types that hold them, 5
+    bytes per entry for batches of up to 256 sources on graphs of
+    fewer than 2**32 vertices, and are turned back into a mask only
+    when the backward sweep reaches them.  Batches run in parallel on `nthreads`
+    threads, by default as many as fit on the CPUs next to the
+    threads GraphBLAS uses for each operation.
+
+    """
+    if AT is None:
+        AT = A.transpose()
+    # finish pending work before the threads share the matrices
+    A.nvals
+    AT.nvals
+    if nthreads is None:
+        nthreads = max(1, (os.cpu_count() or 1) // max(1, options_get()[0]))
+
+    def run(args):
+        _, batch_sources = args
+        return _brandes(A, AT, batch_sources, typ)
+
+    centrality = Vector.dense(typ, A.nrows)
+    batches = list(_batches(sources, batch))
+    with ThreadPoolExecutor(nthreads) as pool:
+        if nthreads > 1 and len(batches) > 1:
+            partials = pool.map(run, batches)
+        else:
+            partials = map(run, batches)
+        for partial in partials:
+            partial.apply(typ.IDENTITY, out=centrality, accum=typ.PLUS)
+    return centrality
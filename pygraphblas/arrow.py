@@ -0,0 +1,100 @@
+"""Columnar edge tables.
+
+Matrices are built from tables holding a row index, a column index
+and a value column, and exported as such tables.  Columns are read
+through the buffer protocol, so numpy arrays, `array.array`,
+memoryviews and the data buffers of Apache Arrow arrays are all used
+without per element Python, and usually without copying.  pyarrow is
+only needed by `to_arrow`, to create the exported table.
+
+"""
+import numpy as np
+
+from .matrix import Matrix
+
+__all__ = ["as_numpy", "from_arrow", "to_arrow"]
+
+
+def _arrow_array(arr):
+    # the data buffer of a single Arrow array, bitmaps are unpacked
+    if arr.null_count:
+        raise ValueError("Cannot convert a column with null values.")
+    dtype = np.dtype(arr.type.to_pandas_dtype())
+    if dtype.kind not in "biuf":
+        raise TypeError("Cannot convert a column of type %s." % arr.type)
+    data = arr.buffers()[1]
+    if data is None or len(arr) == 0:
+        return np.empty(0, dtype)
+    if dtype.kind == "b":
+        bits = np.unpackbits(
+            np.frombuffer(data, np.uint8),
+            count=arr.offset + len(arr),
+            bitorder="little",
+        )
+        return bits[arr.offset :].view(np.bool_)
+    return np.frombuffer(data, dtype, len(arr), arr.offset * dtype.itemsize)
+
+
+def as_numpy(column):
+    """Return `column` as a numpy array.
+
+    Arrow arrays are viewed through the buffer protocol without
+    copying, except for booleans which Arrow stores as bitmaps, and
+    the chunks of a chunked array are concatenated.  Columns with
+    null values raise `ValueError`.  Anything else is passed to
+    `numpy.asarray`.
+
+    """
+    chunks = getattr(column, "chunks", None)
+    if chunks is not None:
+        if len(chunks) == 1:
+            return _arrow_array(chunks[0])
+        if not chunks:
+            return np.empty(0, np.dtype(column.type.to_pandas_dtype()))
+        return np.concatenate([_arrow_array(c) for c in chunks])
+    if hasattr(column, "buffers") and hasattr(column, "null_count"):
+        return _arrow_array(column)
+    return np.asarray(column)
+
+
+def from_arrow(
+    table,
+    row="row",
+    col="col",
+    value="value",
+    nrows=None,
+    ncols=None,
+    typ=None,
+    dup_op=None,
+    **options
+):
+    """Create a new Matrix from the columns `row`, `col` and `value` of
+    `table`.
+
+    `table` is anything indexed by column name, like a `pyarrow.Table`
+    read from Parquet, a dict of arrays or a pandas DataFrame.  With
+    `value` None the matrix holds `typ.one`, True by default, for
+    every entry.  The matrix is built with `Matrix.from_lists`, see it
+    for the other arguments.
+
+    """
+    I = as_numpy(table[row])
+    J = as_numpy(table[col])
+    if value is None:
+        V = np.full(
+            len(I), True if typ is None else typ.one, None if typ is None else typ.dtype
+        )
+    else:
+        V = as_numpy(table[value])
+    return Matrix.from_lists(I, J, V, nrows, ncols, typ, dup_op, **options)
+
+
+def to_arrow(A, names=("row", "col", "value")):
+    """Return the row indices, column indices and values of the matrix
+    `A` as a `pyarrow.Table` with the column `names`.  Numeric columns
+    share the extracted arrays without copying.
+
+    """
+    import pyarrow
+
+    return pyarrow.table(dict(zip(names, A.to_numpy())))
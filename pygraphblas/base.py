@@ -1,3 +1,7 @@
+import pickle
+from array import array
+
+import numpy as np
 from _pygraphblas import lib, ffi
 from numba import njit
 
@@ -22,6 +26,7 @@ __all__ = [
     "IndexOutOfBound",
     "Panic",
     "options_set",
+    "options_get",
 ]
 
 NULL = ffi.NULL
@@ -39,6 +44,15 @@ def options_set(nthreads=None, chunk=None, burble=None):
         _check(lib.GxB_Global_Option_set(lib.GxB_BURBLE, burble))
 
 
+def options_get():
+    """Return the global `(nthreads, chunk)` options."""
+    nthreads = ffi.new("int*")
+    _check(lib.GxB_Global_Option_get(lib.GxB_GLOBAL_NTHREADS, nthreads))
+    chunk = ffi.new("double*")
+    _check(lib.GxB_Global_Option_get(lib.GxB_GLOBAL_CHUNK, chunk))
+    return nthreads[0], chunk[0]
+
+
 class GraphBLASException(Exception):
     pass
 
@@ -161,6 +175,83 @@ def _gb_from_name(name):
     raise TypeError("No such type %s" % name)
 
 
+def _index_array(I):
+    """Return `I` as a contiguous numpy array of `GrB_Index` values.
+
+    Objects supporting the buffer protocol that are already 64 bit
+    integers are viewed without copying, anything else is converted
+    in one vectorized pass.
+
+    """
+    I = np.asarray(I)
+    if I.dtype.kind in "iu" and I.dtype.itemsize == 8:
+        return np.ascontiguousarray(I).view(np.uint64)
+    return np.ascontiguousarray(I, dtype=np.uint64)
+
+
+def _malloc_array(A, dtype, ctype="void"):
+    """Copy `A` into a new malloc'd buffer of `dtype`, casting if needed.
+
+    GraphBLAS import functions take ownership of the buffers they are
+    given and free them with the C library allocator, so memory owned
+    by numpy can't be handed over directly.  Returns a pointer to the
+    buffer suitable for the `**` arguments of the import functions.
+
+    """
+    A = np.asarray(A)
+    dtype = np.dtype(dtype)
+    nbytes = A.size * dtype.itemsize
+    buf = lib.malloc(max(nbytes, 1))
+    if buf == NULL:
+        raise MemoryError
+    np.copyto(np.frombuffer(ffi.buffer(buf, nbytes), dtype), A, casting="unsafe")
+    return ffi.new(ctype + "**", ffi.cast(ctype + "*", buf))
+
+
+def _gc_array(ptr, size, dtype):
+    """Wrap a malloc'd buffer returned by a GraphBLAS export function as a
+    numpy array without copying.  The buffer is freed when the array
+    is garbage collected.
+
+    """
+    dtype = np.dtype(dtype)
+    if ptr == NULL:
+        return np.empty(0, dtype)
+    ptr = ffi.gc(ffi.cast("char*", ptr), lib.free)
+    return np.frombuffer(ffi.buffer(ptr, size * dtype.itemsize), dtype)
+
+
+def _pickle_buffers(arrays, protocol):
+    """Return the numpy `arrays` as raw buffers to pickle with
+    `protocol`.  From protocol 5 on they are `PickleBuffer` objects,
+    which can be passed out-of-band, otherwise bytes copies.
+
+    """
+    if protocol >= 5:
+        return tuple(pickle.PickleBuffer(A) for A in arrays)
+    return tuple(A.tobytes() for A in arrays)
+
+
+def _to_array(A, typecode):
+    """Copy the numpy array `A` into a new `array.array` of `typecode`
+    in one bulk copy, casting first if needed.
+
+    """
+    result = array(typecode)
+    result.frombytes(memoryview(np.ascontiguousarray(A, dtype=typecode)).cast("B"))
+    return result
+
+
+def _from_buffer(ctype, A):
+    """Return a cdata pointer into the numpy array `A`, or NULL if `A` is
+    None.
+
+    """
+    if A is None:
+        return NULL
+    return ffi.from_buffer(ctype, A)
+
+
 def _build_range(rslice, stop_val):
     # if already a list, return it and its length
     if isinstance(rslice, list):
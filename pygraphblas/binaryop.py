@@ -58,7 +58,10 @@ class AutoBinaryOp(BinaryOp):
 
     def get_binaryop(self, left=None, right=None):
         typ = types.promote(left, right)
-        return BinaryOp._auto_binaryops[self.name][typ.gb_type]
+        ops = BinaryOp._auto_binaryops[self.name]
+        if typ.gb_type not in ops:
+            _resolve("_".join((self.name, typ.__name__)))
+        return ops[typ.gb_type]
 
 
 class Accum:
@@ -108,6 +111,12 @@ def binop_group(reg):
 
 
 def build_binaryops():
+    """Create every builtin binary operator now.
+
+    This is not needed for normal use, operators are created on first
+    access through the module or type attribute of the same name.
+
+    """
     this = sys.modules[__name__]
     for r in chain(binop_group(grb_binop_re), binop_group(pure_bool_re)):
         setattr(this, r.name, r)
@@ -116,6 +125,43 @@ def build_binaryops():
         setattr(this, name, bo)
 
 
+def _lib_binaryop(op, typ):
+    # GxB names are preferred, like the sorted scan in build_binaryops
+    for prefix in ("GxB", "GrB"):
+        name = "_".join((prefix, op, typ))
+        if grb_binop_re.match(name) or pure_bool_re.match(name):
+            func = getattr(lib, name, None)
+            if func is not None:
+                return func
+    return None
+
+
+def _resolve(name, auto=True):
+    """Create the operator called `name`, or return None if there is no
+    such builtin operator.  Automatic operators are only tried if `auto`
+    is true.
+
+    """
+    this = sys.modules[__name__]
+    op, _, typ = name.rpartition("_")
+    func = _lib_binaryop(op, typ) if op else None
+    if func is not None:
+        result = BinaryOp(op, typ, func)
+    elif auto and any(_lib_binaryop(name, t) is not None for t in types._real_names):
+        result = AutoBinaryOp(name)
+    else:
+        return None
+    setattr(this, name, result)
+    return result
+
+
+def __getattr__(name):
+    result = _resolve(name)
+    if result is None:
+        raise AttributeError("module %r has no attribute %r" % (__name__, name))
+    return result
+
+
 def binary_op(arg_type, result_type=None):
     if result_type is None:
         result_type = arg_type
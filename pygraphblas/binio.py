@@ -0,0 +1,142 @@
+"""Memory-mapped binary matrix files.
+
+A file is a header page followed by the compressed arrays of a matrix,
+each starting on a page boundary, so the file can be mapped and every
+array used in place as a numpy view of the mapping.  Pages are only
+read when they are touched and the page cache is shared by every
+process that maps the same file.
+
+"""
+import mmap
+import struct
+from itertools import chain
+
+import numpy as np
+
+from . import types
+
+__all__ = ["MapFile", "save", "load"]
+
+MAGIC = b"GrBMmap\0"
+VERSION = 1
+
+# magic, version, layout, type name, nrows, ncols, nvals, nvec,
+# alignment and the (offset, length) of the h, p, i and x arrays.
+_header = struct.Struct("<8sII16sQQQQQ8Q")
+
+# the layouts of Matrix._export_layout
+CSR, CSC, HYPERCSR, HYPERCSC = range(4)
+
+_align = max(mmap.PAGESIZE, mmap.ALLOCATIONGRANULARITY, 4096)
+
+
+def _round_up(n, align):
+    return -(-n // align) * align
+
+
+def save(A, path):
+    """Write the matrix `A` to the file at `path`.
+
+    The matrix is exported in its current format, CSR or CSC and
+    hypersparse or not, so loading it back needs no conversion.
+
+    """
+    layout, arrays = A._export_layout()
+    nvec = len(arrays[1]) - 1
+
+    offsets = []
+    pos = _round_up(_header.size, _align)
+    for a in arrays:
+        offsets.append(pos)
+        pos = _round_up(pos + a.nbytes, _align)
+    nrows, ncols = A.shape
+    header = _header.pack(
+        MAGIC,
+        VERSION,
+        layout,
+        A.type.__name__.encode("ascii"),
+        nrows,
+        ncols,
+        len(arrays[3]),
+        nvec,
+        _align,
+        *chain.from_iterable((o, len(a)) for o, a in zip(offsets, arrays))
+    )
+    with open(path, "wb") as f:
+        f.write(header)
+        for offset, a in zip(offsets, arrays):
+            f.seek(offset)
+            f.write(a.data)
+        f.truncate(pos)
+
+
+class MapFile:
+    """A matrix file written by `save`, mapped into memory.
+
+    Opening the file only reads its header.  `arrays` holds the
+    `(h, p, i, x)` arrays of the file as read only views of the
+    mapping, `h` is empty unless the layout is hypersparse.  `matrix`
+    imports them into a new Matrix.
+
+    """
+
+    __slots__ = ("path", "layout", "type", "shape", "nvals", "arrays", "_map")
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._map) < _header.size:
+            raise ValueError("Not a matrix file.")
+        fields = _header.unpack_from(self._map)
+        magic, version, layout, type_name = fields[:4]
+        if magic != MAGIC:
+            raise ValueError("Not a matrix file.")
+        if version > VERSION:
+            raise ValueError("Unsupported matrix file version %d." % version)
+        nrows, ncols, nvals, nvec, align = fields[4:9]
+        self.layout = layout
+        self.type = types._gb_from_name(type_name.rstrip(b"\0").decode("ascii"))
+        self.shape = (nrows, ncols)
+        self.nvals = nvals
+        dtypes = (np.uint64, np.uint64, np.uint64, self.type.dtype)
+        extents = fields[9:]
+        self.arrays = tuple(
+            np.frombuffer(self._map, dtype, count, offset)
+            for dtype, offset, count in zip(dtypes, extents[::2], extents[1::2])
+        )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *errors):
+        self.close()
+        return False
+
+    def close(self):
+        """Release the mapping, this fails with `BufferError` while views
+        of the arrays are still alive.
+
+        """
+        self.arrays = None
+        self._map.close()
+
+    def matrix(self, **options):
+        """Create a new Matrix from the mapped arrays.
+
+        GraphBLAS takes ownership of imported arrays and frees them
+        itself, so they are copied once, straight from the mapped
+        pages, into buffers it owns.
+
+        """
+        from .matrix import Matrix
+
+        return Matrix._import_layout(
+            self.layout, self.type, *self.shape, *self.arrays, **options
+        )
+
+
+def load(path, **options):
+    """Create a new Matrix from the file at `path` written by `save`."""
+    with MapFile(path) as mf:
+        return mf.matrix(**options)
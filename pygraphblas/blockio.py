@@ -0,0 +1,200 @@
+"""Compressed matrix and vector files.
+
+The exported arrays of a matrix or vector are split into blocks that
+are compressed independently with a stdlib codec, so they are
+compressed and decompressed in parallel on a thread pool, zlib and
+lzma release the GIL while they work.  Index blocks are delta encoded
+and stored in the narrowest integer width that fits the zigzag
+encoded deltas, which is what makes the sorted indices of real graphs
+compress well.
+
+"""
+import os
+import mmap
+import zlib
+import lzma
+import struct
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from . import types
+from .matrix import Matrix
+from .vector import Vector
+
+__all__ = ["save", "load"]
+
+MAGIC = b"GrBBlck\0"
+VERSION = 1
+
+MATRIX, VECTOR = range(2)
+
+# magic, version, kind, layout, codec, type name, nrows, ncols,
+# block size, number of blocks and the lengths of the four streams,
+# which are (h, p, i, x) for a matrix and (i, x) for a vector.
+_header = struct.Struct("<8sIIII16sQQQQ4Q")
+
+_block = np.dtype([("offset", "<u8"), ("size", "<u8"), ("width", "<u8")])
+
+_codecs = {
+    None: (0, None, None),
+    "zlib": (1, zlib.compress, zlib.decompress),
+    "lzma": (2, lzma.compress, lzma.decompress),
+}
+_codec_names = {code: name for name, (code, _, _) in _codecs.items()}
+
+
+def _compressor(codec, level):
+    compress = _codecs[codec][1]
+    if compress is None:
+        return bytes
+    if level is None:
+        return compress
+    if codec == "lzma":
+        return lambda data: compress(data, preset=level)
+    return lambda data: compress(data, level)
+
+
+def _delta_encode(A):
+    # zigzag encoded differences of the uint64 array A
+    d = np.diff(A.view(np.int64), prepend=np.int64(0))
+    z = ((d << 1) ^ (d >> 63)).view(np.uint64)
+    top = int(z.max()) if len(z) else 0
+    width = 1 if top < 1 << 8 else 2 if top < 1 << 16 else 4 if top < 1 << 32 else 8
+    return z.astype("<u%d" % width), width
+
+
+def _delta_decode(data, width, out):
+    z = np.frombuffer(data, "<u%d" % width, len(out)).astype(np.uint64)
+    d = (z >> np.uint64(1)).view(np.int64) ^ -(z & np.uint64(1)).view(np.int64)
+    np.cumsum(d, out=out.view(np.int64))
+
+
+def _streams(obj):
+    if isinstance(obj, Matrix):
+        layout, arrays = obj._export_layout()
+        return MATRIX, layout, obj.shape, arrays
+    return VECTOR, 0, (obj.size, 0), (np.empty(0, np.uint64),) * 2 + obj.dup().export()
+
+
+def save(obj, path, codec="zlib", level=None, block_size=1 << 20, nthreads=None):
+    """Write the Matrix or Vector `obj` to the file at `path`.
+
+    Its arrays are split in blocks of `block_size` entries, compressed
+    with `codec`, one of "zlib", "lzma" or None, at the given `level`
+    on `nthreads` threads, one per CPU by default.
+
+    """
+    if codec not in _codecs:
+        raise ValueError("Unknown codec %s." % codec)
+    kind, layout, (nrows, ncols), arrays = _streams(obj)
+    compress = _compressor(codec, level)
+
+    def encode(args):
+        stream, start = args
+        A = arrays[stream][start : start + block_size]
+        if stream < 3:
+            A, width = _delta_encode(A)
+        else:
+            A, width = A.astype(A.dtype.newbyteorder("<"), copy=False), 0
+        return compress(A.tobytes()), width
+
+    jobs = [
+        (stream, start)
+        for stream, A in enumerate(arrays)
+        for start in range(0, len(A), block_size)
+    ]
+    with ThreadPoolExecutor(nthreads or os.cpu_count() or 1) as pool:
+        blocks = list(pool.map(encode, jobs))
+
+    table = np.zeros(len(blocks), _block)
+    table["size"] = [len(data) for data, width in blocks]
+    table["width"] = [width for data, width in blocks]
+    table["offset"] = np.cumsum(table["size"]) - table["size"]
+    header = _header.pack(
+        MAGIC,
+        VERSION,
+        kind,
+        layout,
+        _codecs[codec][0],
+        obj.type.__name__.encode("ascii"),
+        nrows,
+        ncols,
+        block_size,
+        len(blocks),
+        *(len(A) for A in arrays)
+    )
+    with open(path, "wb") as f:
+        f.write(header)
+        f.write(table.tobytes())
+        for data, width in blocks:
+            f.write(data)
+
+
+def load(path, nthreads=None, **options):
+    """Read the Matrix or Vector in the file at `path` written by `save`.
+
+    The blocks are decompressed in parallel on `nthreads` threads, by
+    default one per CPU.  A corrupt or truncated file raises
+    `ValueError`.
+
+    """
+    with open(path, "rb") as f:
+        data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    if len(data) < _header.size:
+        raise ValueError("Not a block file.")
+    fields = _header.unpack_from(data)
+    magic, version, kind, layout, codec, type_name = fields[:6]
+    if magic != MAGIC:
+        raise ValueError("Not a block file.")
+    if version > VERSION:
+        raise ValueError("Unsupported block file version %d." % version)
+    nrows, ncols, block_size, nblocks = fields[6:10]
+    if kind not in (MATRIX, VECTOR):
+        raise ValueError("Unknown block file kind %d." % kind)
+    if codec not in _codec_names:
+        raise ValueError("Unknown codec %d." % codec)
+    typ = types._gb_from_name(type_name.rstrip(b"\0").decode("ascii"))
+    decompress = _codecs[_codec_names[codec]][2] or bytes
+    view = memoryview(data)
+    start = _header.size + nblocks * _block.itemsize
+    if start > len(data):
+        raise ValueError("Truncated block file.")
+    table = np.frombuffer(data, _block, nblocks, _header.size)
+    room = np.uint64(len(data) - start)
+    if np.any((table["offset"] > room) | (table["size"] > room - table["offset"])):
+        raise ValueError("Truncated block file.")
+    lengths = fields[10:]
+    if lengths[2] != lengths[3] or kind == VECTOR and (lengths[0] or lengths[1]):
+        raise ValueError("Stream lengths do not match.")
+    if block_size == 0 or nblocks != sum(-(-n // block_size) for n in lengths):
+        raise ValueError("Block table does not match the stream lengths.")
+
+    dtypes = (np.uint64, np.uint64, np.uint64, typ.dtype)
+    arrays = [np.empty(n, dtype) for n, dtype in zip(lengths, dtypes)]
+    jobs = [
+        (arrays[stream][pos : pos + block_size], stream)
+        for stream in range(4)
+        for pos in range(0, len(arrays[stream]), block_size)
+    ]
+
+    def decode(k):
+        out, stream = jobs[k]
+        offset, size, width = table[k].tolist()
+        try:
+            block = decompress(view[start + offset : start + offset + size])
+        except (zlib.error, lzma.LZMAError) as e:
+            raise ValueError("Corrupt block %d: %s" % (k, e)) from None
+        if stream < 3:
+            if width not in (1, 2, 4, 8):
+                raise ValueError("Corrupt block %d: bad index width." % k)
+            _delta_decode(block, width, out)
+        else:
+            out[:] = np.frombuffer(block, out.dtype.newbyteorder("<"), len(out))
+
+    with ThreadPoolExecutor(nthreads or os.cpu_count() or 1) as pool:
+        list(pool.map(decode, range(len(jobs))))
+
+    if kind == VECTOR:
+        return Vector.from_buffers(arrays[2], arrays[3], nrows, typ)
+    return Matrix._import_layout(layout, typ, nrows, ncols, *arrays, **options)
@@ -13,3 +13,6 @@ const double INFINITY = 0.0;  // ... is ints only, so this is a workaround
 #define INT32_MIN ...
 #define INT16_MIN ...
 #define INT8_MIN ...
+
+void *malloc(size_t size);
+void free(void *ptr);
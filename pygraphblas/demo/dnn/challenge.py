@@ -13,15 +13,8 @@ BIAS = {1024: -0.3, 4096: -0.35, 16384: -0.4, 65536: -0.45}
 
 @timing
 def load_images(neurons, dest):
-    fname = "{}/sparse-images-{}.{}"
-    binfile = fname.format(dest, neurons, "ssb")
-    if Path(binfile).exists():
-        return Matrix.from_binfile(binfile.encode("ascii"))
-    images = Path(fname.format(dest, neurons, "tsv"))
-    with images.open() as i:
-        m = Matrix.from_tsv(i, FP32, NFEATURES, neurons)
-        m.to_binfile(binfile.encode("ascii"))
-        return m
+    fname = "{}/sparse-images-{}.tsv"
+    return Matrix.from_tsv(fname.format(dest, neurons), FP32, NFEATURES, neurons)
 
 
 def load_categories(neurons, nlayers, dest):
@@ -35,15 +28,10 @@ def load_categories(neurons, nlayers, dest):
 
 
 def load_layer(neurons, dest, i):
-    fname = "{}/neuron{}/n{}-l{}.{}"
-    binfile = fname.format(dest, neurons, neurons, str(i + 1), "ssb")
-    if Path(binfile).exists():
-        return Matrix.from_binfile(binfile.encode("ascii"))
-    l = Path(fname.format(dest, neurons, neurons, str(i + 1), "tsv"))
-    with l.open() as f:
-        m = Matrix.from_tsv(f, FP32, neurons, neurons)
-        m.to_binfile(binfile.encode("ascii"))
-        return m
+    fname = "{}/neuron{}/n{}-l{}.tsv"
+    l = fname.format(dest, neurons, neurons, str(i + 1))
+    # the layers are loaded concurrently, one parser thread each
+    return Matrix.from_tsv(l, FP32, neurons, neurons, nthreads=1)
 
 
 @timing
@@ -80,6 +80,8 @@ otsor = RST1 = R | S | T1
 tosor = RST0 = R | S | T0
 ttsor = RST0T1 = R | S | T0 | T1
 
+oosco = SC = S | C
+
 ooscr = RSC = R | S | C
 otscr = RSCT1 = R | S | C | T1
 toscr = RSCT0 = R | S | C | T0
@@ -120,6 +122,7 @@ __all__ = [
     "otsor",
     "tosor",
     "ttsor",
+    "oosco",
     "ooscr",
     "otscr",
     "toscr",
@@ -147,6 +150,7 @@ __all__ = [
     "RST1",
     "RST0",
     "RST0T1",
+    "SC",
     "RSC",
     "RSCT1",
     "RSCT0",
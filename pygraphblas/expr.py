@@ -0,0 +1,454 @@
+import contextvars
+from functools import wraps
+
+from .base import NULL, _get_bin_op
+from . import binaryop, unaryop, types
+from .binaryop import AutoBinaryOp, current_binop, current_accum
+from .semiring import current_semiring
+from .descriptor import Default, current_desc
+
+current_deferred = contextvars.ContextVar("current_deferred")
+
+__all__ = ["Expr", "Deferred", "lazy", "current_deferred"]
+
+# binary operators for which `A op B == B op A`, these can be folded
+# into an accumulation with the operands swapped.
+_commutative = {
+    "PLUS",
+    "TIMES",
+    "MIN",
+    "MAX",
+    "ANY",
+    "PAIR",
+    "EQ",
+    "NE",
+    "LOR",
+    "LAND",
+    "LXOR",
+    "BOR",
+    "BAND",
+    "BXOR",
+    "BXNOR",
+}
+
+
+class Deferred:
+    """Context manager that turns on deferred evaluation.
+
+    Inside the context the arithmetic operators of `Matrix` and
+    `Vector` record an expression graph instead of running
+    immediately.  The graph is materialized by `Expr.eval`.
+
+    """
+
+    __slots__ = ("token",)
+
+    def __init__(self):
+        self.token = None
+
+    def __enter__(self):
+        self.token = current_deferred.set(True)
+        return self
+
+    def __exit__(self, *errors):
+        current_deferred.reset(self.token)
+        return False
+
+
+def lazy(obj):
+    """Wrap a Matrix or Vector as a deferred expression."""
+    return Expr.wrap(obj)
+
+
+def deferrable(method):
+    """Decorate a Matrix or Vector operator so that it records an `Expr`
+    node when deferred evaluation is on or an operand is already an
+    `Expr`.
+
+    """
+    name = method.__name__
+
+    @wraps(method)
+    def wrapper(self, *args):
+        if (args and isinstance(args[0], Expr)) or current_deferred.get(False):
+            return getattr(Expr.wrap(self), name)(*args)
+        return method(self, *args)
+
+    return wrapper
+
+
+def _is_operand(obj):
+    from .matrix import Matrix
+    from .vector import Vector
+
+    return isinstance(obj, (Expr, Matrix, Vector))
+
+
+def _op_name(op):
+    return op.name.split("_")[0]
+
+
+def _binop(op, typ):
+    if isinstance(op, str):
+        return _get_bin_op(op, typ)
+    return op
+
+
+class Expr:
+    """A node in a deferred GraphBLAS expression graph.
+
+    Nodes are created by the operators of `Matrix`, `Vector` and
+    `Expr` while deferred evaluation is active.  Evaluating the root
+    pushes masks down through element-wise nodes into `mxm`, folds
+    element-wise additions into the accumulator of the operation
+    producing their right operand, and reuses temporaries as outputs
+    so a chain of operators allocates as few intermediates as
+    possible.
+
+    """
+
+    __slots__ = ("op", "args", "type", "shape")
+
+    def __init__(self, op, args, typ, shape):
+        self.op = op
+        self.args = args
+        self.type = typ
+        self.shape = shape
+
+    @classmethod
+    def wrap(cls, obj):
+        if isinstance(obj, Expr):
+            return obj
+        return cls("leaf", (obj,), obj.type, obj.shape)
+
+    @property
+    def is_leaf(self):
+        return self.op == "leaf"
+
+    def leaves(self):
+        """Iterate over the Matrix and Vector operands of the expression."""
+        if self.is_leaf:
+            yield self.args[0]
+            return
+        for arg in self.args:
+            if isinstance(arg, Expr):
+                yield from arg.leaves()
+
+    def __repr__(self):
+        if self.is_leaf:
+            return repr(self.args[0])
+        return "<Expr %s(%s) %s:%s>" % (
+            self.op,
+            ", ".join(repr(a) for a in self.args if isinstance(a, Expr)),
+            "x".join(map(str, self.shape)),
+            self.type.__name__,
+        )
+
+    # building
+
+    def eadd(self, other, add_op=NULL):
+        other = Expr.wrap(other)
+        if add_op is NULL:
+            add_op = current_binop.get(binaryop.PLUS)
+        add_op = _binop(add_op, self.type)
+        typ = types.promote(self.type, other.type)
+        return Expr("eadd", (self, other, add_op), typ, self.shape)
+
+    def emult(self, other, mult_op=NULL):
+        other = Expr.wrap(other)
+        if mult_op is NULL:
+            mult_op = current_binop.get(binaryop.TIMES)
+        mult_op = _binop(mult_op, self.type)
+        typ = types.promote(self.type, other.type)
+        return Expr("emult", (self, other, mult_op), typ, self.shape)
+
+    def apply(self, op):
+        return Expr("apply", (self, op), self.type, self.shape)
+
+    def apply_first(self, first, op):
+        return Expr("apply_first", (self, first, op), self.type, self.shape)
+
+    def apply_second(self, op, second):
+        return Expr("apply_second", (self, op, second), self.type, self.shape)
+
+    def mxm(self, other, semiring=None):
+        other = Expr.wrap(other)
+        if semiring is None:
+            semiring = current_semiring.get(None)
+        typ = types.promote(self.type, other.type, semiring)
+        if len(self.shape) == 1:
+            op, shape = "vxm", other.shape[1:]
+        elif len(other.shape) == 1:
+            op, shape = "mxv", self.shape[:1]
+        else:
+            op, shape = "mxm", (self.shape[0], other.shape[1])
+        return Expr(op, (self, other, semiring), typ, shape)
+
+    def __matmul__(self, other):
+        return self.mxm(other)
+
+    def __rmatmul__(self, other):
+        return Expr.wrap(other).mxm(self)
+
+    def __and__(self, other):
+        return self.emult(other)
+
+    def __rand__(self, other):
+        return Expr.wrap(other).emult(self)
+
+    def __or__(self, other):
+        return self.eadd(other)
+
+    def __ror__(self, other):
+        return Expr.wrap(other).eadd(self)
+
+    def __add__(self, other):
+        if not _is_operand(other):
+            return self.apply_second(self.type.PLUS, other)
+        return self.eadd(other)
+
+    def __radd__(self, other):
+        if not _is_operand(other):
+            return self.apply_first(other, self.type.PLUS)
+        return Expr.wrap(other).eadd(self)
+
+    def __sub__(self, other):
+        if not _is_operand(other):
+            return self.apply_second(self.type.MINUS, other)
+        return self.eadd(other, self.type.MINUS)
+
+    def __rsub__(self, other):
+        if not _is_operand(other):
+            return self.apply_first(other, self.type.MINUS)
+        return Expr.wrap(other).eadd(self, self.type.MINUS)
+
+    def __mul__(self, other):
+        if not _is_operand(other):
+            return self.apply_second(self.type.TIMES, other)
+        return self.eadd(other, self.type.TIMES)
+
+    def __rmul__(self, other):
+        if not _is_operand(other):
+            return self.apply_first(other, self.type.TIMES)
+        return Expr.wrap(other).eadd(self, self.type.TIMES)
+
+    def __truediv__(self, other):
+        if not _is_operand(other):
+            return self.apply_second(self.type.DIV, other)
+        return self.eadd(other, self.type.DIV)
+
+    def __rtruediv__(self, other):
+        if not _is_operand(other):
+            return self.apply_first(other, self.type.DIV)
+        return Expr.wrap(other).eadd(self, self.type.DIV)
+
+    def __invert__(self):
+        return self.apply(unaryop.MINV)
+
+    def __neg__(self):
+        return self.apply(unaryop.AINV)
+
+    def __abs__(self):
+        return self.apply(unaryop.ABS)
+
+    # evaluation
+
+    def eval(self, out=None, mask=NULL, accum=NULL, desc=NULL):
+        """Materialize the expression.
+
+        If `out` is provided the result is written into it with
+        `mask`, `accum` and `desc`, as for the eager operations,
+        otherwise a new Matrix or Vector is returned.  Like the eager
+        operations, `accum` and `desc` default to the `Accum` and
+        descriptor contexts active when `eval` is called, they only
+        apply to the final operation.  The descriptor must not contain
+        transposes, it is pushed down with the mask.
+
+        """
+        if accum is NULL:
+            accum = current_accum.get(NULL)
+        if desc is NULL:
+            desc = current_desc.get(Default)
+        # the intermediate operations must not pick up the contexts
+        accum_token = current_accum.set(NULL)
+        desc_token = current_desc.set(NULL)
+        try:
+            memo = _Memo(self)
+            if out is not None and any(leaf is out for leaf in self.leaves()):
+                # out is also an operand, evaluating into it directly
+                # could overwrite it before it is read.
+                result, _ = self._eval(None, mask, NULL, desc, memo)
+                return result.apply(
+                    unaryop.IDENTITY, out=out, mask=mask, accum=accum, desc=desc
+                )
+            result, temp = self._eval(out, mask, accum, desc, memo)
+            if temp:
+                return result
+            if mask is NULL:
+                return result.dup()
+            return result.apply(unaryop.IDENTITY, mask=mask, desc=desc)
+        finally:
+            current_desc.reset(desc_token)
+            current_accum.reset(accum_token)
+
+    new = eval
+
+    def _new(self, typ=None):
+        from .matrix import Matrix
+        from .vector import Vector
+
+        typ = typ or self.type
+        if len(self.shape) == 1:
+            return Vector.sparse(typ, *self.shape)
+        return Matrix.sparse(typ, *self.shape)
+
+    def _eval(self, out, mask, accum, desc, memo):
+        """Evaluate into `out`, or a new object if `out` is None.
+
+        Returns the result and whether it is a temporary the caller may
+        overwrite.  The mask is a hint for nodes evaluated without an
+        output, the caller applies it again, so leaves are returned as
+        they are unless they are written into `out`.  Nodes used more
+        than once in the graph are evaluated once and never handed out
+        as temporaries.
+
+        """
+        if self.is_leaf:
+            value = self.args[0]
+        elif id(self) in memo.shared:
+            key = (id(self), id(mask), id(desc))
+            value = memo.values.get(key)
+            if value is None:
+                value, _ = self._eval_node(None, mask, NULL, desc, memo)
+                memo.values[key] = value
+        else:
+            return self._eval_node(out, mask, accum, desc, memo)
+        if out is None:
+            return value, False
+        return (
+            value.apply(unaryop.IDENTITY, out=out, mask=mask, accum=accum, desc=desc),
+            True,
+        )
+
+    def _eval_node(self, out, mask, accum, desc, memo):
+        return getattr(self, "_eval_" + self.op)(out, mask, accum, desc, memo)
+
+    def _reuse(self, value, temp):
+        if temp and value.type == self.type:
+            return value
+        return None
+
+    def _eval_apply(self, out, mask, accum, desc, memo):
+        child, op = self.args
+        src, temp = child._eval(None, mask, NULL, desc, memo)
+        if out is None:
+            out = self._reuse(src, temp)
+        return src.apply(op, out=out, mask=mask, accum=accum, desc=desc), True
+
+    def _eval_apply_first(self, out, mask, accum, desc, memo):
+        child, first, op = self.args
+        src, temp = child._eval(None, mask, NULL, desc, memo)
+        if out is None:
+            out = self._reuse(src, temp)
+        return (
+            src.apply_first(first, op, out=out, mask=mask, accum=accum, desc=desc),
+            True,
+        )
+
+    def _eval_apply_second(self, out, mask, accum, desc, memo):
+        child, op, second = self.args
+        src, temp = child._eval(None, mask, NULL, desc, memo)
+        if out is None:
+            out = self._reuse(src, temp)
+        return (
+            src.apply_second(op, second, out=out, mask=mask, accum=accum, desc=desc),
+            True,
+        )
+
+    def _eval_eadd(self, out, mask, accum, desc, memo):
+        left, right, op = self.args
+        if accum is NULL and not right.is_leaf:
+            return self._fold(left, right, op, out, mask, desc, memo)
+        if accum is NULL and not left.is_leaf and _op_name(op) in _commutative:
+            return self._fold(right, left, op, out, mask, desc, memo)
+        return self._ewise("eadd", out, mask, accum, desc, memo)
+
+    def _eval_emult(self, out, mask, accum, desc, memo):
+        return self._ewise("emult", out, mask, accum, desc, memo)
+
+    def _fold(self, left, right, op, out, mask, desc, memo):
+        # left <op> right is the same as accumulating right into left
+        # with op, this saves the temporary for right.
+        if isinstance(op, AutoBinaryOp):
+            op = getattr(self.type, op.name)
+        if out is None:
+            target, temp = left._eval(None, mask, NULL, desc, memo)
+            if self._reuse(target, temp) is None:
+                out = self._new()
+                target.apply(unaryop.IDENTITY, out=out, mask=mask, desc=desc)
+            else:
+                out = target
+        else:
+            left._eval(out, mask, NULL, desc, memo)
+        return right._eval(out, mask, op, desc, memo)
+
+    def _ewise(self, method, out, mask, accum, desc, memo):
+        left, right, op = self.args
+        lval, ltemp = left._eval(None, mask, NULL, desc, memo)
+        rval, rtemp = right._eval(None, mask, NULL, desc, memo)
+        if out is None:
+            out = self._reuse(lval, ltemp)
+        if out is None:
+            out = self._reuse(rval, rtemp)
+        return (
+            getattr(lval, method)(
+                rval, op, cast=self.type, out=out, mask=mask, accum=accum, desc=desc
+            ),
+            True,
+        )
+
+    def _eval_mxm(self, out, mask, accum, desc, memo):
+        left, right, semiring = self.args
+        lval, _ = left._eval(None, NULL, NULL, Default, memo)
+        rval, _ = right._eval(None, NULL, NULL, Default, memo)
+        # the mask is applied inside the multiply, so only the masked
+        # entries of the product are ever computed.
+        return (
+            getattr(lval, self.op)(
+                rval,
+                cast=self.type,
+                out=out,
+                semiring=semiring,
+                mask=mask,
+                accum=accum,
+                desc=desc,
+            ),
+            True,
+        )
+
+    _eval_mxv = _eval_vxm = _eval_mxm
+
+
+class _Memo:
+    """The nodes of an expression used by more than one parent and
+    their values, for the duration of one `Expr.eval`.
+
+    """
+
+    __slots__ = ("shared", "values")
+
+    def __init__(self, root):
+        seen = set()
+        self.shared = set()
+        self.values = {}
+        stack = [root]
+        while stack:
+            node = stack.pop()
+            for arg in node.args:
+                if not isinstance(arg, Expr) or arg.is_leaf:
+                    continue
+                if id(arg) in seen:
+                    self.shared.add(id(arg))
+                else:
+                    seen.add(id(arg))
+                    stack.append(arg)
@@ -1,8 +1,11 @@
+import io
+import os
 import sys
+import copyreg
 import weakref
-import operator
 from random import randint
-from array import array
+
+import numpy as np
 
 from .base import (
     lib,
@@ -10,6 +13,12 @@ from .base import (
     NULL,
     NoValue,
     _check,
+    _index_array,
+    _malloc_array,
+    _gc_array,
+    _from_buffer,
+    _pickle_buffers,
+    _to_array,
     _build_range,
     _get_select_op,
     _get_bin_op,
@@ -22,11 +31,35 @@ from .semiring import Semiring, current_semiring
 from .binaryop import BinaryOp, current_accum, current_binop
 from .unaryop import UnaryOp
 from .monoid import Monoid, current_monoid
-from . import descriptor
+from . import descriptor, textio
+from .expr import deferrable
 from .descriptor import Descriptor, Default, TransposeA, current_desc
 
 __all__ = ["Matrix"]
 
+_mm_field_types = {
+    "real": types.FP64,
+    "integer": types.INT64,
+    "complex": types.FC64,
+    "pattern": types.BOOL,
+}
+
+
+# compressed layouts of a matrix, see Matrix._export_layout
+_layouts = ("csr", "csc", "hypercsr", "hypercsc")
+
+
+def _mm_type(mm):
+    """The type of a parsed Matrix Market file, from its `%%GraphBLAS`
+    comment or else its field.
+
+    """
+    if mm.type_name is not None:
+        typ = getattr(types, mm.type_name.rpartition("_")[2], None)
+        if isinstance(typ, types.MetaType) and typ.dtype is not None:
+            return typ
+    return _mm_field_types[mm.field]
+
 
 class Matrix:
     """GraphBLAS Sparse Matrix
@@ -35,7 +68,22 @@ class Matrix:
 
     """
 
-    __slots__ = ("matrix", "type", "_funcs", "_keep_alives")
+    __slots__ = (
+        "matrix",
+        "type",
+        "_funcs",
+        "_keep_alives",
+        "_cache_T",
+        "_T",
+        "_T_of",
+        "_dims",
+        "_nvals",
+        "__weakref__",
+    )
+
+    transpose_cache_limit = 1 << 26
+    """Matrices with more values than this never cache their transpose.
+    Set to None to remove the limit."""
 
     def __init__(self, matrix, typ=None, **options):
         if typ is None:
@@ -47,6 +95,11 @@ class Matrix:
         self.matrix = matrix
         self.type = typ
         self._keep_alives = weakref.WeakKeyDictionary()
+        self._cache_T = False
+        self._T = None
+        self._T_of = None
+        self._dims = None
+        self._nvals = None
         if options:
             self.options_set(**options)
 
@@ -62,6 +115,7 @@ class Matrix:
         new_mat = ffi.new("GrB_Matrix*")
         _check(lib.GrB_Matrix_new(new_mat, typ.gb_type, nrows, ncols))
         m = cls(new_mat, typ, **options)
+        m._dims = (nrows, ncols)
         return m
 
     @classmethod
@@ -73,46 +127,158 @@ class Matrix:
         return m
 
     @classmethod
-    def from_lists(cls, I, J, V, nrows=None, ncols=None, typ=None, **options):
+    def from_lists(
+        cls, I, J, V, nrows=None, ncols=None, typ=None, dup_op=None, **options
+    ):
         """Create a new matrix from the given lists of row indices, column
         indices, and values.  If nrows or ncols are not provided, they
         are computed from the max values of the provides row and
         column indices lists.
 
+        The lists can also be any objects supporting the buffer
+        protocol, like `array.array` or numpy arrays, in which case
+        the type is inferred from their format.  The matrix is built
+        with one call to `GrB_Matrix_build`, duplicate entries are
+        combined with `dup_op`, by default the last value wins.
+
         """
         assert len(I) == len(J) == len(V)
+        if typ is None:
+            typ = types._gb_from_values(V)
+        I = _index_array(I)
+        J = _index_array(J)
         if not nrows:
-            nrows = max(I) + 1
+            nrows = int(I.max()) + 1
         if not ncols:
-            ncols = max(J) + 1
-        # TODO use ffi and GrB_Matrix_build
-        if typ is None:
-            typ = types._gb_from_type(type(V[0]))
+            ncols = int(J.max()) + 1
         m = cls.sparse(typ, nrows, ncols, **options)
-        for i, j, v in zip(I, J, V):
-            m[i, j] = v
+        m.build(I, J, V, dup_op)
         return m
 
+    def build(self, I, J, V, dup_op=None):
+        """Build the matrix from the given row indices, column indices
+        and values with `GrB_Matrix_build`.  The matrix must be empty.
+
+        Entries with the same row and column index are combined with
+        `dup_op`, which defaults to `SECOND`.
+
+        """
+        if not types._is_buildable(self.type):
+            for i, j, v in zip(I, J, V):
+                self[int(i), int(j)] = v
+            return
+        if dup_op is None:
+            dup_op = binaryop.SECOND
+        if isinstance(dup_op, BinaryOp):
+            dup_op = dup_op.get_binaryop(self.type)
+        I = _index_array(I)
+        J = _index_array(J)
+        X = np.ascontiguousarray(V, dtype=self.type.dtype)
+        self._invalidate()
+        _check(
+            self.type.Matrix_build(
+                self.matrix[0],
+                ffi.from_buffer("GrB_Index[]", I),
+                ffi.from_buffer("GrB_Index[]", J),
+                ffi.from_buffer(self.type.C + "[]", X),
+                len(X),
+                dup_op,
+            )
+        )
+
     @classmethod
-    def from_mm(cls, mm_file, typ, **options):
+    def from_mm(cls, mm_file, typ=None, nthreads=None, **options):
         """Create a new matrix by reading a Matrix Market file.
 
+        `mm_file` is either an open file, which is read with
+        `LAGraph_mmread`, or a path.  A file given by its path is
+        memory-mapped and parsed in parallel on `nthreads` threads,
+        one per CPU by default, and the matrix is made with one call
+        to `GrB_Matrix_build`.  In that case `typ` defaults to the
+        type in a `%%GraphBLAS` comment of the file, or else to the
+        type of its field.  For an open file it defaults to the type of
+        the matrix LAGraph read.
+
         """
+        if isinstance(mm_file, (str, bytes, os.PathLike)):
+            mm = textio.read_mm(mm_file, nthreads)
+            if typ is None:
+                typ = _mm_type(mm)
+            X = mm.X
+            if X is None:
+                X = np.full(len(mm.I), typ.one, dtype=typ.dtype)
+            m = cls.sparse(typ, mm.nrows, mm.ncols, **options)
+            m.build(mm.I, mm.J, X)
+            return m
         m = ffi.new("GrB_Matrix*")
-        i = cls(m, typ, **options)
         _check(lib.LAGraph_mmread(m, mm_file))
-        return i
+        return cls(m, typ, **options)
 
     @classmethod
     def from_tsv(cls, tsv_file, typ, nrows, ncols, **options):
         """Create a new matrix by reading a tab separated value file.
 
+        `tsv_file` is either an open file, which is read with
+        `LAGraph_tsvread`, or a path which is loaded in parallel with
+        `from_edgelist`.
+
         """
+        if isinstance(tsv_file, (str, bytes, os.PathLike)):
+            return cls.from_edgelist(
+                tsv_file, typ, nrows, ncols, delimiter="\t", **options
+            )
         m = ffi.new("GrB_Matrix*")
         i = cls(m, typ, **options)
         _check(lib.LAGraph_tsvread(m, tsv_file, typ.gb_type, nrows, ncols))
         return i
 
+    @classmethod
+    def from_edgelist(
+        cls,
+        path,
+        typ=None,
+        nrows=None,
+        ncols=None,
+        columns=(0, 1, 2),
+        base=1,
+        delimiter=None,
+        comment="#",
+        skiprows=0,
+        dup_op=None,
+        nthreads=None,
+        **options
+    ):
+        """Create a new matrix from the edge list file at `path`, like a
+        TSV or CSV file.
+
+        `columns` are the positions of the row index, column index and
+        value fields on each line, without a value field every entry
+        is `typ.one`.  Indices are `base` based.  Fields are separated
+        by whitespace and `delimiter`, and the first `skiprows` lines
+        and lines starting with `comment` are skipped.
+
+        The file is memory-mapped and parsed in parallel on `nthreads`
+        threads, one per CPU by default, then the matrix is made with
+        one call to `GrB_Matrix_build`.  `typ` defaults to `FP64`, or
+        `BOOL` without values.  If nrows or ncols are not provided,
+        they are computed from the largest indices.
+
+        """
+        if typ is None:
+            typ = types.FP64 if len(columns) > 2 else types.BOOL
+        I, J, X = textio.read_edges(
+            path, columns, base, typ.dtype, delimiter, comment, skiprows, nthreads,
+        )
+        if X is None:
+            X = np.full(len(I), typ.one, dtype=typ.dtype)
+        if not nrows:
+            nrows = int(I.max()) + 1 if len(I) else 0
+        if not ncols:
+            ncols = int(J.max()) + 1 if len(J) else 0
+        m = cls.sparse(typ, nrows, ncols, **options)
+        m.build(I, J, X, dup_op)
+        return m
+
     @classmethod
     def from_binfile(cls, bin_file):
         """Create a new matrix by reading a SuiteSparse specific binary file.
@@ -121,6 +287,204 @@ class Matrix:
         _check(lib.LAGraph_binread(m, bin_file))
         return cls(m)
 
+    @classmethod
+    def from_arrow(
+        cls,
+        table,
+        row="row",
+        col="col",
+        value="value",
+        nrows=None,
+        ncols=None,
+        typ=None,
+        dup_op=None,
+        **options
+    ):
+        """Create a new matrix from the index and value columns of an
+        edge table, like a `pyarrow.Table` or a dict of arrays.  The
+        columns are read through the buffer protocol, see
+        `arrow.from_arrow`.
+
+        """
+        from . import arrow
+
+        return arrow.from_arrow(
+            table, row, col, value, nrows, ncols, typ, dup_op, **options
+        )
+
+    @classmethod
+    def from_mapfile(cls, path, **options):
+        """Create a new matrix from a file written by `to_mapfile`.
+
+        The file is memory-mapped and its arrays are copied once,
+        from the mapped pages into buffers GraphBLAS owns.  For a zero
+        copy view of them use `binio.MapFile.arrays`, which reads the
+        file without creating the matrix.
+
+        """
+        from . import binio
+
+        return binio.load(path, **options)
+
+    @classmethod
+    def from_blockfile(cls, path, nthreads=None, **options):
+        """Create a new matrix from a compressed file written by
+        `to_blockfile`, decompressing its blocks in parallel on
+        `nthreads` threads.
+
+        """
+        from . import blockio
+
+        result = blockio.load(path, nthreads, **options)
+        if not isinstance(result, Matrix):
+            raise TypeError("%s does not hold a Matrix." % path)
+        return result
+
+    @classmethod
+    def from_csr(cls, indptr, indices, values, ncols=None, typ=None, **options):
+        """Create a new matrix from compressed sparse row arrays.
+
+        The column indices of each row must be sorted and free of
+        duplicates.  The arrays are copied once into buffers owned by
+        GraphBLAS, which imports them in constant time.
+
+        """
+        nrows = len(indptr) - 1
+        if ncols is None:
+            ncols = int(np.max(indices)) + 1 if len(indices) else 0
+        return cls._import(
+            lib.GxB_Matrix_import_CSR,
+            nrows,
+            ncols,
+            None,
+            indptr,
+            indices,
+            values,
+            typ,
+            **options
+        )
+
+    @classmethod
+    def from_csc(cls, indptr, indices, values, nrows=None, typ=None, **options):
+        """Create a new matrix from compressed sparse column arrays.
+
+        """
+        ncols = len(indptr) - 1
+        if nrows is None:
+            nrows = int(np.max(indices)) + 1 if len(indices) else 0
+        return cls._import(
+            lib.GxB_Matrix_import_CSC,
+            nrows,
+            ncols,
+            None,
+            indptr,
+            indices,
+            values,
+            typ,
+            **options
+        )
+
+    @classmethod
+    def from_hypercsr(
+        cls, rows, indptr, indices, values, nrows, ncols, typ=None, **options
+    ):
+        """Create a new matrix from hypersparse CSR arrays, `rows` is the
+        sorted list of rows that have entries.
+
+        """
+        return cls._import(
+            lib.GxB_Matrix_import_HyperCSR,
+            nrows,
+            ncols,
+            rows,
+            indptr,
+            indices,
+            values,
+            typ,
+            **options
+        )
+
+    @classmethod
+    def from_hypercsc(
+        cls, cols, indptr, indices, values, nrows, ncols, typ=None, **options
+    ):
+        """Create a new matrix from hypersparse CSC arrays, `cols` is the
+        sorted list of columns that have entries.
+
+        """
+        return cls._import(
+            lib.GxB_Matrix_import_HyperCSC,
+            nrows,
+            ncols,
+            cols,
+            indptr,
+            indices,
+            values,
+            typ,
+            **options
+        )
+
+    @classmethod
+    def from_scipy(cls, sp, typ=None, **options):
+        """Create a new matrix from a `scipy.sparse` matrix.
+
+        CSR and CSC matrices are imported directly from their index
+        and data arrays, any index width or dtype cast is folded into
+        the single copy GraphBLAS import needs.  Other formats are
+        converted to CSR first.
+
+        """
+        if sp.format not in ("csr", "csc"):
+            sp = sp.tocsr()
+        if not sp.has_canonical_format:
+            sp = sp.copy()
+            sp.sum_duplicates()
+        nrows, ncols = sp.shape
+        if sp.format == "csc":
+            return cls.from_csc(
+                sp.indptr, sp.indices, sp.data, nrows, typ=typ, **options
+            )
+        return cls.from_csr(sp.indptr, sp.indices, sp.data, ncols, typ=typ, **options)
+
+    @classmethod
+    def _import(
+        cls, import_func, nrows, ncols, hyper, indptr, indices, values, typ, **options
+    ):
+        if typ is None:
+            typ = types._gb_from_values(values)
+        if typ.dtype is None:
+            raise TypeError("Cannot import values of type %s." % typ.__name__)
+        if len(indptr) == 0:
+            raise ValueError("Import needs a non-empty indptr.")
+        if hyper is not None and len(indptr) != len(hyper) + 1:
+            raise ValueError(
+                "Import needs len(indptr) == len(hyper) + 1, got %d and %d."
+                % (len(indptr), len(hyper))
+            )
+        nvals = len(values)
+        end = int(indptr[-1])
+        if len(indices) != nvals or end != nvals:
+            raise ValueError(
+                "Import needs indptr[-1] == len(indices) == len(values), "
+                "got %d, %d and %d." % (end, len(indices), nvals)
+            )
+        buffers = []
+        if hyper is not None:
+            buffers.append(_malloc_array(hyper, np.uint64, "GrB_Index"))
+        buffers.append(_malloc_array(indptr, np.uint64, "GrB_Index"))
+        buffers.append(_malloc_array(indices, np.uint64, "GrB_Index"))
+        buffers.append(_malloc_array(values, typ.dtype))
+        args = buffers if hyper is None else [len(hyper)] + buffers
+        m = ffi.new("GrB_Matrix*")
+        try:
+            _check(import_func(m, typ.gb_type, nrows, ncols, nvals, -1, *args, NULL))
+        finally:
+            # on success GraphBLAS owns the buffers and NULLs the pointers
+            for p in buffers:
+                if p[0] != NULL:
+                    lib.free(p[0])
+        return cls(m, typ, **options)
+
     @classmethod
     def random(
         cls,
@@ -167,8 +531,12 @@ class Matrix:
     @classmethod
     def identity(cls, typ, nrows, **options):
         result = cls.sparse(typ, nrows, nrows, **options)
-        for i in range(nrows):
-            result[i, i] = result.type.one
+        if not types._is_buildable(typ):
+            for i in range(nrows):
+                result[i, i] = result.type.one
+            return result
+        I = np.arange(nrows, dtype=np.uint64)
+        result.build(I, I, np.full(nrows, typ.one, dtype=typ.dtype))
         return result
 
     @property
@@ -176,34 +544,37 @@ class Matrix:
         """Return the GraphBLAS low-level type object of the Matrix.
 
         """
-        new_type = ffi.new("GrB_Type*")
-        _check(lib.GxB_Matrix_type(new_type, self.matrix[0]))
-        return new_type[0]
+        return self.type.gb_type
 
     @property
     def nrows(self):
         """Return the number of Matrix rows.
 
         """
-        n = ffi.new("GrB_Index*")
-        _check(lib.GrB_Matrix_nrows(n, self.matrix[0]))
-        return n[0]
+        return self.shape[0]
 
     @property
     def ncols(self):
         """Return the number of Matrix columns.
 
         """
-        n = ffi.new("GrB_Index*")
-        _check(lib.GrB_Matrix_ncols(n, self.matrix[0]))
-        return n[0]
+        return self.shape[1]
 
     @property
     def shape(self):
         """Numpy-like description of matrix shape.
 
+        The dimensions are only queried from GraphBLAS once, they can
+        only change through `resize`.
+
         """
-        return (self.nrows, self.ncols)
+        dims = self._dims
+        if dims is None:
+            n = ffi.new("GrB_Index[2]")
+            _check(lib.GrB_Matrix_nrows(n, self.matrix[0]))
+            _check(lib.GrB_Matrix_ncols(n + 1, self.matrix[0]))
+            dims = self._dims = (n[0], n[1])
+        return dims
 
     @property
     def square(self):
@@ -214,13 +585,47 @@ class Matrix:
         """Return the number of Matrix values.
 
         """
-        n = ffi.new("GrB_Index*")
+        n = self._nvals
+        if n is None:
+            n = self._nvals = ffi.new("GrB_Index*")
         _check(lib.GrB_Matrix_nvals(n, self.matrix[0]))
         return n[0]
 
     @property
     def T(self):
-        return self.transpose()
+        """The transpose of the matrix.
+
+        If the matrix was created with `cache_transpose=True` the
+        transpose is computed once and kept until the matrix is next
+        modified, unless the matrix holds more than
+        `transpose_cache_limit` values.
+
+        """
+        if not self._cache_T:
+            return self.transpose()
+        if self._T is None:
+            limit = self.transpose_cache_limit
+            if limit is not None and self.nvals > limit:
+                return self.transpose()
+            T = self.transpose()
+            T._T_of = weakref.ref(self)
+            self._T = T
+        return self._T
+
+    def _invalidate(self):
+        """Drop the cached transpose, called before every write to the
+        matrix.  Writing to a cached transpose also drops it from the
+        matrix it was cached on.
+
+        """
+        if self._T is not None:
+            self._T._T_of = None
+            self._T = None
+        if self._T_of is not None:
+            owner = self._T_of()
+            self._T_of = None
+            if owner is not None and owner._T is self:
+                owner._T = None
 
     def dup(self, **options):
         """Create an duplicate Matrix.
@@ -230,7 +635,11 @@ class Matrix:
         _check(lib.GrB_Matrix_dup(new_mat, self.matrix[0]))
         return self.__class__(new_mat, self.type, **options)
 
-    def options_set(self, hyper=None, format=None):
+    def options_set(self, hyper=None, format=None, cache_transpose=None):
+        if cache_transpose is not None:
+            self._cache_T = cache_transpose
+            if not cache_transpose:
+                self._invalidate()
         if hyper:
             hyper = ffi.cast("double", hyper)
             _check(lib.GxB_Matrix_Option_set(self.matrix[0], lib.GxB_HYPER, hyper))
@@ -260,11 +669,61 @@ class Matrix:
         _check(lib.LAGraph_pattern(r, self.matrix[0], typ.gb_type))
         return Matrix(r, typ)
 
-    def to_mm(self, fileobj):
+    def to_mm(self, target, nthreads=None, max_nvals=1 << 22):
         """Write this matrix to a file using the Matrix Market format.
 
+        `target` is a path, gzip compressed if it ends with ".gz", or
+        a binary file object such as a pipe or a `gzip.GzipFile`.  The
+        tuples are extracted in blocks of at most `max_nvals` values
+        and formatted on `nthreads` threads, see `textio.write_mm`.
+
+        A text file object is written by LAGraph instead, one line at
+        a time.
+
+        """
+        if isinstance(target, io.TextIOBase):
+            _check(lib.LAGraph_mmwrite(self.matrix[0], target))
+            return
+        textio.write_mm(
+            target,
+            self.nrows,
+            self.ncols,
+            self.nvals,
+            self.iterblocks(max_nvals),
+            self.type.__name__,
+            nthreads,
+        )
+
+    def to_arrow(self, names=("row", "col", "value")):
+        """Return the rows, columns and values of this matrix as a
+        `pyarrow.Table` with the column `names`, see `arrow.to_arrow`.
+
         """
-        _check(lib.LAGraph_mmwrite(self.matrix[0], fileobj))
+        from . import arrow
+
+        return arrow.to_arrow(self, names)
+
+    def to_mapfile(self, path):
+        """Write this matrix to a versioned binary file whose arrays are
+        page aligned, so it can be loaded by memory-mapping it.  See
+        `from_mapfile`.
+
+        """
+        from . import binio
+
+        binio.save(self, path)
+
+    def to_blockfile(
+        self, path, codec="zlib", level=None, block_size=1 << 20, nthreads=None
+    ):
+        """Write this matrix to a compressed file.  Indices are delta
+        encoded, and all arrays are compressed with `codec` in
+        independent blocks of `block_size` entries, see `blockio.save`.
+
+        """
+        from . import blockio
+
+        blockio.save(self, path, codec, level, block_size, nthreads)
 
     def to_binfile(self, filename, comments=NULL):
         """Write this matrix using custom SuiteSparse binary format.
@@ -276,6 +735,8 @@ class Matrix:
         """Extract the rows, columns and values of the Matrix as 3 lists.
 
         """
+        if self.type.dtype is not None:
+            return [A.tolist() for A in self.to_numpy()]
         I = ffi.new("GrB_Index[%s]" % self.nvals)
         J = ffi.new("GrB_Index[%s]" % self.nvals)
         V = self.type.ffi.new(self.type.C + "[%s]" % self.nvals)
@@ -284,11 +745,236 @@ class Matrix:
         _check(self.type.Matrix_extractTuples(I, J, V, n, self.matrix[0]))
         return [list(I), list(J), list(map(self.type.to_value, V))]
 
+    def to_numpy(self, rows=True, cols=True, vals=True):
+        """Extract the row indices, column indices and values of the
+        Matrix as 3 numpy arrays with one call to
+        `GrB_Matrix_extractTuples`.
+
+        Parts passed as False are not extracted and returned as None.
+
+        """
+        if vals and self.type.dtype is None:
+            raise TypeError("Cannot extract values of type %s." % self.type.__name__)
+        nvals = self.nvals
+        n = ffi.new("GrB_Index*", nvals)
+        I = np.empty(nvals, np.uint64) if rows else None
+        J = np.empty(nvals, np.uint64) if cols else None
+        X = np.empty(nvals, self.type.dtype) if vals else None
+        _check(
+            self.type.Matrix_extractTuples(
+                _from_buffer("GrB_Index[]", I),
+                _from_buffer("GrB_Index[]", J),
+                _from_buffer(self.type.C + "[]", X),
+                n,
+                self.matrix[0],
+            )
+        )
+        return I, J, X
+
+    def iterbatches(self, size=1 << 20):
+        """Iterate over the Matrix in batches of at most `size` entries.
+
+        Each batch is a tuple of numpy arrays `(I, J, X)`, slices of
+        one extraction of the whole matrix, so no Python objects are
+        created per entry.
+
+        """
+        I, J, X = self.to_numpy()
+        for start in range(0, len(I), size):
+            stop = start + size
+            yield I[start:stop], J[start:stop], X[start:stop]
+
+    def _row_counts(self, by_col=False):
+        """Return the indices of the non-empty rows, or columns if
+        `by_col`, and their number of values as numpy arrays.
+
+        The counts are the `PLUS_PAIR` product of the matrix with a
+        vector holding its non-empty columns, or rows, so besides the
+        counts only that vector is allocated, never a copy of the
+        matrix.
+
+        """
+        inner, outer = (self.nrows, self.ncols) if by_col else (self.ncols, self.nrows)
+        present = self.reduce_vector(
+            self.type.ANY_MONOID,
+            out=Vector.sparse(self.type, inner),
+            desc=Default if by_col else TransposeA,
+        )
+        counts = self.mxv(
+            present,
+            cast=types.INT64,
+            out=Vector.sparse(types.INT64, outer),
+            semiring=types.INT64.PLUS_PAIR,
+            desc=TransposeA if by_col else Default,
+        )
+        return counts.to_numpy()
+
+    def row_degrees(self):
+        """Return a numpy array with the number of values in each row.
+
+        """
+        I, X = self._row_counts()
+        result = np.zeros(self.nrows, np.int64)
+        result[I] = X
+        return result
+
+    def iterblocks(self, max_nvals=1 << 22):
+        """Iterate over the Matrix in blocks of consecutive rows holding at
+        most `max_nvals` values.  A matrix stored by column is split
+        in blocks of consecutive columns instead, so every block is
+        extracted without scanning the rest of the matrix.
+
+        Each block is extracted on its own and yielded as numpy arrays
+        `(I, J, X)` with indices relative to the whole matrix.
+        Besides the block, the memory used beyond the matrix is the
+        counts of its non-empty rows and columns.  A single row or
+        column with more than `max_nvals` values is yielded as one
+        block.
+
+        """
+        by_col = self.options_get()[1] != lib.GxB_BY_ROW
+        keys, counts = self._row_counts(by_col)
+        ends = np.cumsum(counts)
+        k = 0
+        while k < len(keys):
+            end = np.searchsorted(ends, ends[k] - counts[k] + max_nvals, "right")
+            end = max(int(end), k + 1)
+            start = int(keys[k])
+            span = slice(start, int(keys[end - 1]))
+            if by_col:
+                block = self.extract_matrix(None, span)
+            else:
+                block = self.extract_matrix(span)
+            I, J, X = block.to_numpy()
+            del block
+            if by_col:
+                J += np.uint64(start)
+            else:
+                I += np.uint64(start)
+            yield I, J, X
+            k = end
+
+    def _export_layout(self, move=False):
+        """Export the matrix in its current layout as `(layout, (h, p, i,
+        x))`, where layout indexes `_layouts` and `h` is empty unless
+        the matrix is hypersparse.  See `to_csr` for `move`.
+
+        """
+        hyper, fmt, is_hyper = self.options_get()
+        layout = 2 * bool(is_hyper) + (fmt != lib.GxB_BY_ROW)
+        arrays = getattr(self, "to_" + _layouts[layout])(move)
+        if not is_hyper:
+            arrays = (np.empty(0, np.uint64),) + arrays
+        return layout, arrays
+
+    @classmethod
+    def _import_layout(cls, layout, typ, nrows, ncols, h, p, i, x, **options):
+        """Create a new matrix from the arrays returned by
+        `_export_layout`.
+
+        """
+        if layout == 0:
+            return cls.from_csr(p, i, x, ncols, typ, **options)
+        if layout == 1:
+            return cls.from_csc(p, i, x, nrows, typ, **options)
+        if layout == 2:
+            return cls.from_hypercsr(h, p, i, x, nrows, ncols, typ, **options)
+        return cls.from_hypercsc(h, p, i, x, nrows, ncols, typ, **options)
+
+    def to_csr(self, move=False):
+        """Export the matrix as `(indptr, indices, values)` compressed sparse
+        row numpy arrays.
+
+        If `move` is True the arrays are taken from the matrix without
+        copying and the matrix is left empty, otherwise a duplicate
+        is exported.
+
+        """
+        return self._export(lib.GxB_Matrix_export_CSR, move)
+
+    def to_csc(self, move=False):
+        """Export the matrix as `(indptr, indices, values)` compressed sparse
+        column numpy arrays.  See `to_csr` for `move`.
+
+        """
+        return self._export(lib.GxB_Matrix_export_CSC, move, by_row=False)
+
+    def to_hypercsr(self, move=False):
+        """Export the matrix as `(rows, indptr, indices, values)` hypersparse
+        CSR numpy arrays.  See `to_csr` for `move`.
+
+        """
+        return self._export(lib.GxB_Matrix_export_HyperCSR, move, hyper=True)
+
+    def to_hypercsc(self, move=False):
+        """Export the matrix as `(cols, indptr, indices, values)` hypersparse
+        CSC numpy arrays.  See `to_csr` for `move`.
+
+        """
+        return self._export(lib.GxB_Matrix_export_HyperCSC, move, hyper=True)
+
+    def to_scipy(self, fmt="csr", move=False):
+        """Export the matrix as a `scipy.sparse` matrix in "csr" or "csc"
+        format.  The exported arrays are shared with the scipy matrix
+        without copying, see `to_csr` for `move`.
+
+        """
+        from scipy import sparse
+
+        shape = self.shape
+        if fmt == "csr":
+            indptr, indices, values = self.to_csr(move)
+            result = sparse.csr_matrix(shape, dtype=values.dtype)
+        elif fmt == "csc":
+            indptr, indices, values = self.to_csc(move)
+            result = sparse.csc_matrix(shape, dtype=values.dtype)
+        else:
+            raise ValueError("Unknown scipy sparse format %s." % fmt)
+        # assign directly, the constructor may downcast the indices
+        result.indptr = indptr.view(np.int64)
+        result.indices = indices.view(np.int64)
+        result.data = values
+        result.has_sorted_indices = True
+        return result
+
+    def _export(self, export_func, move, hyper=False, by_row=True):
+        if self.type.dtype is None:
+            raise TypeError("Cannot export values of type %s." % self.type.__name__)
+        A = self if move else self.dup()
+        typ = ffi.new("GrB_Type*")
+        nrows = ffi.new("GrB_Index*")
+        ncols = ffi.new("GrB_Index*")
+        nvals = ffi.new("GrB_Index*")
+        nonempty = ffi.new("int64_t*")
+        nvec = ffi.new("GrB_Index*")
+        Ah = ffi.new("GrB_Index**")
+        Ap = ffi.new("GrB_Index**")
+        Ai = ffi.new("GrB_Index**")
+        Ax = ffi.new("void**")
+        args = [nvec, Ah, Ap, Ai, Ax] if hyper else [Ap, Ai, Ax]
+        _check(export_func(A.matrix, typ, nrows, ncols, nvals, nonempty, *args, NULL))
+        if move:
+            self._invalidate()
+            _check(lib.GrB_Matrix_new(self.matrix, typ[0], nrows[0], ncols[0]))
+        if hyper:
+            nptr = nvec[0] + 1
+        else:
+            nptr = (nrows[0] if by_row else ncols[0]) + 1
+        result = (
+            _gc_array(Ap[0], nptr, np.uint64),
+            _gc_array(Ai[0], nvals[0], np.uint64),
+            _gc_array(Ax[0], nvals[0], self.type.dtype),
+        )
+        if hyper:
+            result = (_gc_array(Ah[0], nvec[0], np.uint64),) + result
+        return result
+
     def clear(self):
         """Clear the matrix.  This does not change the size but removes all
         values.
 
         """
+        self._invalidate()
         _check(lib.GrB_Matrix_clear(self.matrix[0]))
 
     def resize(self, nrows, ncols):
@@ -296,7 +982,9 @@ class Matrix:
         outside the resized matrix are deleted.
 
         """
+        self._invalidate()
         _check(lib.GrB_Matrix_resize(self.matrix[0], nrows, ncols))
+        self._dims = (nrows, ncols)
 
     def transpose(self, cast=None, out=None, **kwargs):
         """ Transpose matrix. """
@@ -314,6 +1002,7 @@ class Matrix:
             _check(lib.GrB_Matrix_new(_out, typ.gb_type, *new_dimensions))
             out = self.__class__(_out, typ)
         mask, accum, desc = self._get_args(**kwargs)
+        out._invalidate()
         _check(lib.GrB_transpose(out.matrix[0], mask, accum, self.matrix[0], desc))
         return out
 
@@ -352,7 +1041,7 @@ class Matrix:
         elif isinstance(add_op, str):
             add_op = _get_bin_op(add_op, self.type)
 
-        add_op = add_op.get_binaryop(self, other)
+        add_op = add_op.get_binaryop(self.type, other.type)
         mask, accum, desc = self._get_args(**kwargs)
         if out is None:
             typ = cast or types.promote(self.type, other.type)
@@ -360,6 +1049,7 @@ class Matrix:
             _check(lib.GrB_Matrix_new(_out, typ.gb_type, self.nrows, self.ncols))
             out = Matrix(_out, typ)
 
+        out._invalidate()
         _check(
             lib.GrB_eWiseAdd_Matrix_BinaryOp(
                 out.matrix[0],
@@ -391,7 +1081,7 @@ class Matrix:
         elif isinstance(mult_op, str):
             mult_op = _get_bin_op(mult_op, self.type)
 
-        mult_op = mult_op.get_binaryop(self, other)
+        mult_op = mult_op.get_binaryop(self.type, other.type)
         mask, accum, desc = self._get_args(**kwargs)
         if out is None:
             typ = cast or types.promote(self.type, other.type)
@@ -399,6 +1089,7 @@ class Matrix:
             _check(lib.GrB_Matrix_new(_out, typ.gb_type, self.nrows, self.ncols))
             out = Matrix(_out, typ)
 
+        out._invalidate()
         _check(
             lib.GrB_eWiseMult_Matrix_BinaryOp(
                 out.matrix[0],
@@ -416,7 +1107,7 @@ class Matrix:
         """Compare two matrices for equality.
         """
         result = ffi.new("_Bool*")
-        eq_op = self.type.EQ.get_binaryop(self, other)
+        eq_op = self.type.EQ.get_binaryop(self.type, other.type)
         _check(lib.LAGraph_isequal(result, self.matrix[0], other.matrix[0], eq_op))
         return result[0]
 
@@ -426,12 +1117,33 @@ class Matrix:
         return not self.iseq(other)
 
     def __getstate__(self):
-        pass
+        """Return the type name, layout, shape and compressed arrays of a
+        copy of the matrix, see `_export_layout`.
 
-    def __setstate__(self, data):
-        pass
+        """
+        layout, arrays = self._export_layout()
+        return (self.type.__name__, layout, self.shape, arrays)
+
+    def __setstate__(self, state):
+        type_name, layout, (nrows, ncols), arrays = state
+        typ = getattr(types, type_name)
+        h, p, i = (np.frombuffer(A, np.uint64) for A in arrays[:3])
+        x = np.frombuffer(arrays[3], typ.dtype)
+        A = self._import_layout(layout, typ, nrows, ncols, h, p, i, x)
+        self.__init__(A.matrix, typ)
+        self._dims = (nrows, ncols)
+        A.matrix = ffi.new("GrB_Matrix*")
+
+    def __reduce_ex__(self, protocol):
+        # the arrays are pickled as raw buffers, out-of-band with
+        # protocol 5 so they are not copied into the pickle stream.
+        type_name, layout, shape, arrays = self.__getstate__()
+        state = (type_name, layout, shape, _pickle_buffers(arrays, protocol))
+        return copyreg.__newobj__, (type(self),), state
 
     def __iter__(self):
+        if self.type.dtype is not None:
+            return self._iter_batches()
         nvals = self.nvals
         _nvals = ffi.new("GrB_Index[1]", [nvals])
         I = ffi.new("GrB_Index[%s]" % nvals)
@@ -440,37 +1152,44 @@ class Matrix:
         _check(self.type.Matrix_extractTuples(I, J, X, _nvals, self.matrix[0]))
         return zip(I, J, map(self.type.to_value, X))
 
+    def _iter_batches(self, size=1 << 16):
+        # convert one batch at a time to Python objects
+        for I, J, X in self.iterbatches(size):
+            yield from zip(I.tolist(), J.tolist(), X.tolist())
+
     def to_arrays(self):
+        """Extract the row indices, column indices and values of the
+        Matrix as 3 `array.array` columns, copied in bulk from the
+        arrays of `to_numpy`.
+
+        """
         if self.type.typecode is None:
             raise TypeError("This matrix has no array typecode.")
-        nvals = self.nvals
-        _nvals = ffi.new("GrB_Index[1]", [nvals])
-        I = ffi.new("GrB_Index[%s]" % nvals)
-        J = ffi.new("GrB_Index[%s]" % nvals)
-        X = self.type.ffi.new("%s[%s]" % (self.type.C, nvals))
-        _check(self.type.Matrix_extractTuples(I, J, X, _nvals, self.matrix[0]))
-        return array("L", I), array("L", J), array(self.type.typecode, X)
+        I, J, X = self.to_numpy()
+        return _to_array(I, "L"), _to_array(J, "L"), _to_array(X, self.type.typecode)
 
     @property
     def rows(self):
         """ An iterator of row indexes present in the matrix.
         """
-        for i, j, v in self:
-            yield i
+        I, _, _ = self.to_numpy(cols=False, vals=False)
+        return iter(I.tolist())
 
     @property
     def cols(self):
         """ An iterator of column indexes present in the matrix.
         """
-        for i, j, v in self:
-            yield j
+        _, J, _ = self.to_numpy(rows=False, vals=False)
+        return iter(J.tolist())
 
     @property
     def vals(self):
         """ An iterator of values present in the matrix.
         """
-        for i, j, v in self:
-            yield v
+        if self.type.dtype is None:
+            return (v for _, _, v in self)
+        _, _, X = self.to_numpy(rows=False, cols=False)
+        return iter(X.tolist())
 
     def __len__(self):
         return self.nvals
@@ -478,6 +1197,7 @@ class Matrix:
     def __nonzero__(self):
         return self.reduce_bool()
 
+    @deferrable
     def __and__(self, other):
         mask, accum, desc = self._get_args()
         return self.emult(other, mask=mask, accum=accum, desc=desc)
@@ -486,6 +1206,7 @@ class Matrix:
         mask, accum, desc = self._get_args()
         return self.emult(other, mask=mask, accum=accum, desc=desc, out=self)
 
+    @deferrable
     def __or__(self, other):
         mask, accum, desc = self._get_args()
         return self.eadd(other, mask=mask, accum=accum, desc=desc)
@@ -494,6 +1215,7 @@ class Matrix:
         mask, accum, desc = self._get_args()
         return self.eadd(other, mask=mask, accum=accum, desc=desc, out=self)
 
+    @deferrable
     def __add__(self, other):
         mask, accum, desc = self._get_args()
         if not isinstance(other, Matrix):
@@ -502,6 +1224,7 @@ class Matrix:
             )
         return self.eadd(other, mask=mask, accum=accum, desc=desc)
 
+    @deferrable
     def __radd__(self, other):
         mask, accum, desc = self._get_args()
         if not isinstance(other, Matrix):
@@ -518,6 +1241,7 @@ class Matrix:
             )
         return self.eadd(other, out=self, mask=mask, accum=accum, desc=desc)
 
+    @deferrable
     def __sub__(self, other):
         mask, accum, desc = self._get_args()
         if not isinstance(other, Matrix):
@@ -528,6 +1252,7 @@ class Matrix:
             other, add_op=self.type.MINUS, mask=mask, accum=accum, desc=desc
         )
 
+    @deferrable
     def __rsub__(self, other):
         mask, accum, desc = self._get_args()
         if not isinstance(other, Matrix):
@@ -548,6 +1273,7 @@ class Matrix:
             self, out=self, add_op=self.type.MINUS, mask=mask, accum=accum, desc=desc
         )
 
+    @deferrable
     def __mul__(self, other):
         mask, accum, desc = self._get_args()
         if not isinstance(other, Matrix):
@@ -558,6 +1284,7 @@ class Matrix:
             other, add_op=self.type.TIMES, mask=mask, accum=accum, desc=desc
         )
 
+    @deferrable
     def __rmul__(self, other):
         mask, accum, desc = self._get_args()
         if not isinstance(other, Matrix):
@@ -578,6 +1305,7 @@ class Matrix:
             self, out=self, add_op=self.type.TIMES, mask=mask, accum=accum, desc=desc
         )
 
+    @deferrable
     def __truediv__(self, other):
         mask, accum, desc = self._get_args()
         if not isinstance(other, Matrix):
@@ -586,6 +1314,7 @@ class Matrix:
             )
         return self.eadd(other, add_op=self.type.DIV, mask=mask, accum=accum, desc=desc)
 
+    @deferrable
     def __rtruediv__(self, other):
         mask, accum, desc = self._get_args()
         if not isinstance(other, Matrix):
@@ -604,24 +1333,67 @@ class Matrix:
             self, out=self, add_op=self.type.DIV, mask=mask, accum=accum, desc=desc
         )
 
+    @deferrable
     def __invert__(self):
         return self.apply(unaryop.MINV)
 
+    @deferrable
     def __neg__(self):
         return self.apply(unaryop.AINV)
 
+    @deferrable
     def __abs__(self):
         return self.apply(unaryop.ABS)
 
     def __pow__(self, exponent):
+        return self.power(exponent)
+
+    def power(self, exponent, semiring=None, mask=NULL, desc=Default, early_exit=False):
+        """Raise this square matrix to a non-negative integer power.
+
+        The power is computed by repeated squaring, so only
+        O(log(exponent)) multiplications are done.  The `semiring`
+        defaults to the current semiring.  `mask` and `desc` are only
+        applied to the final multiplication, for exponents 0 and 1, or
+        an early exit with nothing left to multiply, they mask a copy.
+
+        If `early_exit` is true, squaring stops as soon as squaring no
+        longer changes the pattern of the matrix.  This is exact when
+        values are determined by the pattern, for example reachability
+        closure with `BOOL.LOR_LAND`.
+
+        """
+        if exponent < 0:
+            raise ValueError("exponent must be non-negative")
         if exponent == 0:
-            return self.__class__.identity(self.type, self.nrows)
-        if exponent == 1:
-            return self
-        result = self.dup()
-        for i in range(1, exponent):
-            result.mxm(self, out=result)
-        return result
+            result = self.__class__.identity(self.type, self.nrows)
+            if mask is NULL:
+                return result
+            return result.apply(unaryop.IDENTITY, mask=mask, desc=desc)
+
+        if semiring is None:
+            semiring = current_semiring.get(None)
+
+        result = None
+        base = self
+        while exponent > 1:
+            if exponent & 1:
+                result = base if result is None else result.mxm(base, semiring=semiring)
+            exponent >>= 1
+            if exponent == 1 and result is None:
+                return base.mxm(base, semiring=semiring, mask=mask, desc=desc)
+            squared = base.mxm(base, semiring=semiring)
+            if (
+                early_exit
+                and squared.nvals == base.nvals
+                and squared.emult(base, binaryop.FIRST).nvals == base.nvals
+            ):
+                exponent = 1
+            base = squared
+
+        if result is None:
+            return base.apply(unaryop.IDENTITY, mask=mask, desc=desc)
+        return result.mxm(base, semiring=semiring, mask=mask, desc=desc)
 
     def reduce_bool(self, mon=NULL, **kwargs):
         """Reduce matrix to a boolean.
@@ -629,7 +1401,7 @@ class Matrix:
         """
         if mon is NULL:
             mon = current_monoid.get(types.BOOL.LOR_MONOID)
-        mon = mon.get_monoid(self)
+        mon = mon.get_monoid(self.type)
         result = ffi.new("_Bool*")
         mask, accum, desc = self._get_args(**kwargs)
         _check(lib.GrB_Matrix_reduce_BOOL(result, accum, mon, self.matrix[0], desc))
@@ -641,7 +1413,7 @@ class Matrix:
         """
         if mon is NULL:
             mon = current_monoid.get(types.INT64.PLUS_MONOID)
-        mon = mon.get_monoid(self)
+        mon = mon.get_monoid(self.type)
         result = ffi.new("int64_t*")
         mask, accum, desc = self._get_args(**kwargs)
         _check(lib.GrB_Matrix_reduce_INT64(result, accum, mon, self.matrix[0], desc))
@@ -653,7 +1425,7 @@ class Matrix:
         """
         if mon is NULL:
             mon = current_monoid.get(self.type.PLUS_MONOID)
-        mon = mon.get_monoid(self)
+        mon = mon.get_monoid(self.type)
         mask, accum, desc = self._get_args(**kwargs)
         result = ffi.new("double*")
         _check(lib.GrB_Matrix_reduce_FP64(result, accum, mon, self.matrix[0], desc))
@@ -665,7 +1437,7 @@ class Matrix:
         """
         if mon is NULL:
             mon = current_monoid.get(getattr(self.type, "PLUS_MONOID", NULL))
-        mon = mon.get_monoid(self)
+        mon = mon.get_monoid(self.type)
         if out is None:
             out = Vector.sparse(self.type, self.nrows)
         mask, accum, desc = self._get_args(**kwargs)
@@ -685,6 +1457,7 @@ class Matrix:
         if isinstance(op, UnaryOp):
             op = op.get_unaryop(self)
         mask, accum, desc = self._get_args(**kwargs)
+        out._invalidate()
         _check(
             lib.GrB_Matrix_apply(out.matrix[0], mask, accum, op, self.matrix[0], desc)
         )
@@ -697,12 +1470,14 @@ class Matrix:
         if out is None:
             out = self.__class__.sparse(self.type, self.nrows, self.ncols)
         if isinstance(op, BinaryOp):
-            op = op.get_binaryop(self)
+            op = op.get_binaryop(self.type)
         mask, accum, desc = self._get_args(**kwargs)
         if isinstance(first, Scalar):
             f = lib.GxB_Matrix_apply_BinaryOp1st
+            first = first.scalar[0]
         else:
             f = self.type.Matrix_apply_BinaryOp1st
+        out._invalidate()
         _check(f(out.matrix[0], mask, accum, op, first, self.matrix[0], desc))
         return out
 
@@ -713,13 +1488,15 @@ class Matrix:
         if out is None:
             out = self.__class__.sparse(self.type, self.nrows, self.ncols)
         if isinstance(op, BinaryOp):
-            op = op.get_binaryop(self)
+            op = op.get_binaryop(self.type)
         mask, accum, desc = self._get_args(**kwargs)
-        _check(
-            self.type.Matrix_apply_BinaryOp2nd(
-                out.matrix[0], mask, accum, op, self.matrix[0], second, desc
-            )
-        )
+        if isinstance(second, Scalar):
+            f = lib.GxB_Matrix_apply_BinaryOp2nd
+            second = second.scalar[0]
+        else:
+            f = self.type.Matrix_apply_BinaryOp2nd
+        out._invalidate()
+        _check(f(out.matrix[0], mask, accum, op, self.matrix[0], second, desc))
         return out
 
     def select(self, op, thunk=NULL, out=NULL, **kwargs):
@@ -738,6 +1515,7 @@ class Matrix:
 
         mask, accum, desc = self._get_args(**kwargs)
 
+        out._invalidate()
         _check(
             lib.GxB_Matrix_select(
                 out.matrix[0], mask, accum, op, self.matrix[0], thunk, desc
@@ -772,42 +1550,51 @@ class Matrix:
         )
         return self.eadd(B, self.type.FIRST)
 
-    def compare(self, other, op, strop):
+    def compare(self, other, strop, fill=None):
+        """Compare this matrix to a scalar or another matrix.
+
+        Comparing to a scalar returns a BOOL matrix holding True for
+        the stored entries the comparison holds for, like `select`,
+        so the result can be used as a mask.  Comparing to another
+        matrix compares the intersection of the two patterns, unless
+        `fill` is given, then the union is compared and an entry
+        missing from one side is taken to be `fill`.  The comparison
+        never builds a dense intermediate.
+
+        """
         C = self.__class__.sparse(types.BOOL, self.nrows, self.ncols)
         if isinstance(other, (bool, int, float)):
-            if op(other, 0):
-                B = self.__class__.dup(self)
-                B[:, :] = other
-                self.emult(B, strop, out=C)
-                return C
-            else:
-                self.select(strop, other).apply(types.BOOL.ONE, out=C)
-                return C
+            typ = types.promote(self.type, types._gb_from_type(type(other)))
+            self.apply_second(_get_bin_op(strop, typ), Scalar.from_value(other), out=C)
+            return C.select("!=0", out=C)
         elif isinstance(other, Matrix):
-            A = self.full()
-            B = other.full()
-            A.emult(B, strop, out=C)
+            cmp_op = _get_bin_op(strop, types.promote(self.type, other.type))
+            self.emult(other, cmp_op, out=C)
+            if fill is not None:
+                fill = Scalar.from_value(fill)
+                self.apply_second(cmp_op, fill, out=C, mask=other, desc=descriptor.SC)
+                other.apply_first(fill, cmp_op, out=C, mask=self, desc=descriptor.SC)
             return C
         else:
             raise NotImplementedError
 
     def __gt__(self, other):
-        return self.compare(other, operator.gt, ">")
+        return self.compare(other, ">")
 
     def __lt__(self, other):
-        return self.compare(other, operator.lt, "<")
+        return self.compare(other, "<")
 
     def __ge__(self, other):
-        return self.compare(other, operator.ge, ">=")
+        return self.compare(other, ">=")
 
     def __le__(self, other):
-        return self.compare(other, operator.le, "<=")
+        return self.compare(other, "<=")
 
     def __eq__(self, other):
-        return self.compare(other, operator.eq, "==")
+        return self.compare(other, "==")
 
     def __ne__(self, other):
-        return self.compare(other, operator.ne, "!=")
+        return self.compare(other, "!=")
 
     def _get_args(self, mask=NULL, accum=NULL, desc=Default):
         if isinstance(mask, Matrix):
@@ -817,7 +1604,7 @@ class Matrix:
         if accum is NULL:
             accum = current_accum.get(NULL)
         if isinstance(accum, BinaryOp):
-            accum = accum.get_binaryop(self)
+            accum = accum.get_binaryop(self.type)
         if desc is NULL:
             desc = current_desc.get(NULL)
         if isinstance(desc, Descriptor):
@@ -839,6 +1626,7 @@ class Matrix:
         if semiring is None:
             semiring = typ.PLUS_TIMES
 
+        out._invalidate()
         _check(
             lib.GrB_mxm(
                 out.matrix[0],
@@ -883,6 +1671,7 @@ class Matrix:
         )
         return out
 
+    @deferrable
     def __matmul__(self, other):
         if isinstance(other, Matrix):
             return self.mxm(other)
@@ -909,6 +1698,7 @@ class Matrix:
         if isinstance(op, BinaryOp):
             op = op.get_binaryop(self.type, other.type)
 
+        out._invalidate()
         _check(
             lib.GrB_Matrix_kronecker_BinaryOp(
                 out.matrix[0], mask, accum, op, self.matrix[0], other.matrix[0], desc
@@ -937,6 +1727,7 @@ class Matrix:
         if out is None:
             out = self.__class__.sparse(self.type, isize, jsize)
 
+        out._invalidate()
         _check(
             lib.GrB_Matrix_extract(
                 out.matrix[0], mask, accum, self.matrix[0], I, ni, J, nj, desc
@@ -1015,6 +1806,7 @@ class Matrix:
         I, ni, size = _build_range(row_slice, stop_val)
         mask, accum, desc = self._get_args(**kwargs)
 
+        self._invalidate()
         _check(
             lib.GrB_Col_assign(
                 self.matrix[0], mask, accum, value.vector[0], I, ni, col_index, desc
@@ -1029,6 +1821,7 @@ class Matrix:
         I, ni, size = _build_range(col_slice, stop_val)
 
         mask, accum, desc = self._get_args(**kwargs)
+        self._invalidate()
         _check(
             lib.GrB_Row_assign(
                 self.matrix[0], mask, accum, value.vector[0], row_index, I, ni, desc
@@ -1048,6 +1841,7 @@ class Matrix:
 
         mask, accum, desc = self._get_args(**kwargs)
 
+        self._invalidate()
         _check(
             lib.GrB_Matrix_assign(
                 self.matrix[0], mask, accum, value.matrix[0], I, ni, J, nj, desc
@@ -1067,6 +1861,7 @@ class Matrix:
             J = lib.GrB_ALL
             nj = 0
         scalar_type = types._gb_from_type(type(value))
+        self._invalidate()
         _check(
             scalar_type.Matrix_assignScalar(
                 self.matrix[0], mask, accum, value, I, ni, J, nj, desc
@@ -1104,6 +1899,7 @@ class Matrix:
         i1 = index[1]
         if isinstance(i0, int) and isinstance(i1, int):
             val = self.type.from_value(value)
+            self._invalidate()
             _check(self.type.Matrix_setElement(self.matrix[0], val, i0, i1))
             return
 
@@ -1136,6 +1932,7 @@ class Matrix:
             raise TypeError(
                 "__delitem__ currently only supports single element removal"
             )
+        self._invalidate()
         _check(lib.GrB_Matrix_removeElement(self.matrix[0], index[0], index[1]))
 
     def __contains__(self, index):
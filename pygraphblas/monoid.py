@@ -60,7 +60,11 @@ class AutoMonoid(Monoid):
 
     def get_monoid(self, left=None, right=None):
         typ = types.promote(left, right)
-        return Monoid._auto_monoids[self.name][typ.gb_type]
+        monoids = Monoid._auto_monoids[self.name]
+        if typ.gb_type not in monoids:
+            op = self.name[: -len("_MONOID")]
+            _resolve("_".join((op, typ.__name__, "monoid")))
+        return monoids[typ.gb_type]
 
 
 __all__ = ["Monoid", "AutoMonoid", "current_monoid"]
@@ -89,6 +93,12 @@ def monoid_group(reg):
 
 
 def build_monoids():
+    """Create every builtin monoid now.
+
+    This is not needed for normal use, monoids are created on first
+    access through the module or type attribute of the same name.
+
+    """
     this = sys.modules[__name__]
     for r in chain(
         monoid_group(gxb_monoid_re),
@@ -100,3 +110,50 @@ def build_monoids():
     for name in Monoid._auto_monoids:
         bo = AutoMonoid(name)
         setattr(this, name, bo)
+
+
+def _lib_monoid(op, typ):
+    # the GrB names win, like the scan order in build_monoids
+    for reg, lib_name in (
+        (grb_monoid_re, "GrB_%s_MONOID_%s"),
+        (pure_bool_re_v13, "GrB_%s_MONOID_%s"),
+        (gxb_monoid_re, "GxB_%s_%s_MONOID"),
+        (pure_bool_re, "GxB_%s_%s_MONOID"),
+    ):
+        lib_name = lib_name % (op, typ)
+        if reg.match(lib_name):
+            func = getattr(lib, lib_name, None)
+            if func is not None:
+                return func
+    return None
+
+
+def _resolve(name):
+    """Create the monoid called `name`, or return None if there is no
+    such builtin monoid.  Typed monoids are named like `PLUS_INT64_monoid`
+    and automatic ones like `PLUS_MONOID`.
+
+    """
+    this = sys.modules[__name__]
+    if name.endswith("_monoid"):
+        op, _, typ = name[: -len("_monoid")].rpartition("_")
+        func = _lib_monoid(op, typ) if op else None
+        if func is None:
+            return None
+        result = Monoid(op, typ, func)
+    elif name.endswith("_MONOID"):
+        op = name[: -len("_MONOID")]
+        if not any(_lib_monoid(op, t) is not None for t in types._real_names):
+            return None
+        result = AutoMonoid(name)
+    else:
+        return None
+    setattr(this, name, result)
+    return result
+
+
+def __getattr__(name):
+    result = _resolve(name)
+    if result is None:
+        raise AttributeError("module %r has no attribute %r" % (__name__, name))
+    return result
@@ -6,6 +6,7 @@ from .base import (
     _check_no_val_key_error,
 )
 
+from . import types
 from .types import _gb_from_type
 
 __all__ = ["Scalar"]
@@ -38,6 +39,17 @@ class Scalar:
         _check(lib.GxB_Scalar_dup(new_sca, self.scalar[0]))
         return self.__class__(new_sca, self._type)
 
+    def __getstate__(self):
+        return (self._type.__name__, self[0] if self.nvals else None)
+
+    def __setstate__(self, state):
+        type_name, value = state
+        s = self.from_type(getattr(types, type_name))
+        self.__init__(s.scalar, s._type)
+        s.scalar = ffi.new("GxB_Scalar*")
+        if value is not None:
+            self[0] = value
+
     @classmethod
     def from_type(cls, typ):
         """Create an empty Scalar from the given type and size.
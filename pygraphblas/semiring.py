@@ -50,7 +50,10 @@ class AutoSemiring(Semiring):
 
     def get_semiring(self, left=None, right=None):
         typ = types.promote(left, right)
-        return Semiring._auto_semirings[self.name][typ.gb_type]
+        srs = Semiring._auto_semirings[self.name]
+        if typ.gb_type not in srs:
+            _resolve("_".join((self.name, typ.__name__)))
+        return srs[typ.gb_type]
 
 
 __all__ = ["Semiring", "AutoSemiring", "current_semiring"]
@@ -95,6 +98,12 @@ def semiring_group(reg):
 
 
 def build_semirings():
+    """Create every builtin semiring now.
+
+    This is not needed for normal use, semirings are created on first
+    access through the module or type attribute of the same name.
+
+    """
     this = sys.modules[__name__]
     for r in chain(
         semiring_group(non_boolean_re),
@@ -107,3 +116,47 @@ def build_semirings():
     for name in Semiring._auto_semirings:
         sr = AutoSemiring(name)
         setattr(this, name, sr)
+
+
+_regexes = (non_boolean_re, boolean_re, pure_bool_re, bitwise_re, complex_re)
+
+
+def _lib_semiring(name, typ):
+    # GxB names are preferred, like the sorted scan in build_semirings
+    for prefix in ("GxB", "GrB"):
+        lib_name = "_".join((prefix, name, typ))
+        for reg in _regexes:
+            match = reg.match(lib_name)
+            if match is not None:
+                func = getattr(lib, lib_name, None)
+                if func is not None:
+                    return match, func
+    return None
+
+
+def _resolve(name, auto=True):
+    """Create the semiring called `name`, or return None if there is no
+    such builtin semiring.  Automatic semirings are only tried if `auto`
+    is true.
+
+    """
+    this = sys.modules[__name__]
+    sr, _, typ = name.rpartition("_")
+    found = _lib_semiring(sr, typ) if sr else None
+    if found is not None:
+        match, func = found
+        prefix, pls, mul, typ = match.groups()
+        result = Semiring(pls, mul, typ, func)
+    elif auto and any(_lib_semiring(name, t) is not None for t in types._builtin_names):
+        result = AutoSemiring(name)
+    else:
+        return None
+    setattr(this, name, result)
+    return result
+
+
+def __getattr__(name):
+    result = _resolve(name)
+    if result is None:
+        raise AttributeError("module %r has no attribute %r" % (__name__, name))
+    return result
@@ -0,0 +1,907 @@
+"""Parallel parsers and writers for text matrix files.
+
+Files are memory-mapped and split into line-aligned chunks.  Each
+chunk is parsed by a numba function that releases the GIL, so the
+chunks are parsed concurrently on a thread pool, straight into
+coordinate arrays that can be handed to `GrB_Matrix_build`.  Writing
+works the other way around, chunks of coordinate arrays are formatted
+concurrently into byte buffers that are written in order.
+
+"""
+import os
+import gzip
+import math
+import mmap
+import contextlib
+from collections import deque, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from numba import njit
+
+__all__ = ["MMData", "read_mm", "read_edges", "write_mm"]
+
+MMData = namedtuple("MMData", "nrows ncols I J X field symmetry type_name")
+MMData.__doc__ = """The contents of a Matrix Market file.
+
+`I` and `J` are zero based int64 arrays, `X` holds the values (None
+for pattern files) with the symmetric entries already expanded.
+`type_name` is the GraphBLAS type recorded by a `%%GraphBLAS` comment,
+if there is one.
+
+"""
+
+# field kinds of the chunk parser, unsigned integers are stored in
+# the int64 columns with their bits unchanged
+_INT = 0
+_FLOAT = 1
+_SKIP = 2
+_UINT = 3
+
+_INT64_MAX = np.uint64((1 << 63) - 1)
+_UINT64_MAX = np.uint64((1 << 64) - 1)
+
+_NL = 10
+_SPACE = 32
+
+# bytes per chunk, there are at least this many bytes per chunk except
+# for the last one.
+_min_chunk = 1 << 20
+
+_U32 = np.uint64(0xFFFFFFFF)
+
+
+def _pow5_table():
+    # 128 bit truncated powers of five from 5**-342 to 5**308, see
+    # Lemire, "Number Parsing at a Gigabyte per Second" (2021).
+    table = np.empty((651, 2), dtype=np.uint64)
+    mask = (1 << 64) - 1
+    for q in range(-342, 309):
+        if q < 0:
+            power5 = 5 ** -q
+            z = power5.bit_length()
+            b = z + 127 if q >= -27 else 2 * z + 128
+            c = (1 << b) // power5 + 1
+            c >>= max(c.bit_length() - 128, 0)
+        else:
+            c = 5 ** q
+            if c.bit_length() < 128:
+                c <<= 128 - c.bit_length()
+            else:
+                c >>= c.bit_length() - 128
+        table[q + 342] = (c >> 64, c & mask)
+    return table
+
+
+_pow5 = _pow5_table()
+_pow10 = np.array([10.0 ** i for i in range(23)])
+
+
+@njit(nogil=True, cache=True)
+def _mul128(a, b):
+    a_lo = a & _U32
+    a_hi = a >> np.uint64(32)
+    b_lo = b & _U32
+    b_hi = b >> np.uint64(32)
+    p0 = a_lo * b_lo
+    p1 = a_lo * b_hi
+    p2 = a_hi * b_lo
+    p3 = a_hi * b_hi
+    mid = (p0 >> np.uint64(32)) + (p1 & _U32) + (p2 & _U32)
+    lo = (p0 & _U32) | (mid << np.uint64(32))
+    hi = p3 + (p1 >> np.uint64(32)) + (p2 >> np.uint64(32)) + (mid >> np.uint64(32))
+    return hi, lo
+
+
+@njit(nogil=True, cache=True)
+def _eisel_lemire(w, q):
+    # Returns (value, ok) for the decimal w * 10**q, ok is False when
+    # the result can't be decided or is subnormal.
+    if q < -342:
+        return 0.0, True
+    if q > 308:
+        return np.inf, True
+    lz = 0
+    for shift in (32, 16, 8, 4, 2, 1):
+        if w >> np.uint64(64 - shift) == np.uint64(0):
+            w <<= np.uint64(shift)
+            lz += shift
+    index = q + 342
+    hi, lo = _mul128(w, _pow5[index, 0])
+    if (hi & np.uint64(0x1FF)) == np.uint64(0x1FF):
+        hi2, lo2 = _mul128(w, _pow5[index, 1])
+        lo = lo + hi2
+        if hi2 > lo:
+            hi += np.uint64(1)
+    upperbit = hi >> np.uint64(63)
+    mantissa = hi >> (upperbit + np.uint64(9))
+    power2 = (((152170 + 65536) * q) >> 16) + 63 + int(upperbit) - lz + 1023
+    if power2 <= 0:
+        return 0.0, False
+    if (
+        lo <= np.uint64(1)
+        and -4 <= q <= 23
+        and (mantissa & np.uint64(3)) == np.uint64(1)
+        and (mantissa << (upperbit + np.uint64(9))) == hi
+    ):
+        mantissa &= ~np.uint64(1)
+    mantissa += mantissa & np.uint64(1)
+    mantissa >>= np.uint64(1)
+    if mantissa >= np.uint64(2 << 52):
+        mantissa = np.uint64(1 << 52)
+        power2 += 1
+    if power2 >= 0x7FF:
+        return np.inf, True
+    return math.ldexp(float(mantissa), power2 - 1075), True
+
+
+@njit(nogil=True, cache=True)
+def _parse_float(buf, start, stop):
+    # Returns (value, ok), tokens that aren't plain decimals (nan,
+    # inf) or have more than 19 significant digits are not ok and are
+    # left to Python.
+    pos = start
+    neg = False
+    if pos < stop and (buf[pos] == 45 or buf[pos] == 43):
+        neg = buf[pos] == 45
+        pos += 1
+    w = np.uint64(0)
+    digits = 0
+    exp10 = 0
+    seen = False
+    while pos < stop and 48 <= buf[pos] <= 57:
+        if digits > 0 or buf[pos] != 48:
+            w = w * np.uint64(10) + np.uint64(buf[pos] - 48)
+            digits += 1
+        seen = True
+        pos += 1
+    if pos < stop and buf[pos] == 46:
+        pos += 1
+        while pos < stop and 48 <= buf[pos] <= 57:
+            if digits > 0 or buf[pos] != 48:
+                w = w * np.uint64(10) + np.uint64(buf[pos] - 48)
+                digits += 1
+            exp10 -= 1
+            seen = True
+            pos += 1
+    if not seen or digits > 19:
+        return 0.0, False
+    if pos < stop and (buf[pos] == 101 or buf[pos] == 69):
+        pos += 1
+        eneg = False
+        if pos < stop and (buf[pos] == 45 or buf[pos] == 43):
+            eneg = buf[pos] == 45
+            pos += 1
+        if pos == stop:
+            return 0.0, False
+        e = 0
+        while pos < stop and 48 <= buf[pos] <= 57:
+            if e < 100000:
+                e = e * 10 + (buf[pos] - 48)
+            pos += 1
+        exp10 += -e if eneg else e
+    if pos != stop:
+        return 0.0, False
+    if w == np.uint64(0):
+        value = 0.0
+    elif w <= np.uint64(1 << 53) and -22 <= exp10 <= 22:
+        if exp10 >= 0:
+            value = float(w) * _pow10[exp10]
+        else:
+            value = float(w) / _pow10[-exp10]
+    else:
+        value, ok = _eisel_lemire(w, exp10)
+        if not ok:
+            return 0.0, False
+    return -value if neg else value, True
+
+
+@njit(nogil=True, cache=True)
+def _parse_int(buf, start, stop, unsigned):
+    pos = start
+    neg = False
+    if pos < stop and (buf[pos] == 45 or buf[pos] == 43):
+        neg = buf[pos] == 45
+        pos += 1
+    if pos == stop:
+        return 0, False
+    # the largest magnitude that fits
+    if unsigned:
+        limit = np.uint64(0) if neg else _UINT64_MAX
+    else:
+        limit = _INT64_MAX + np.uint64(neg)
+    value = np.uint64(0)
+    while pos < stop:
+        c = buf[pos]
+        if c < 48 or c > 57:
+            return 0, False
+        d = np.uint64(c - 48)
+        if d > limit or value > (limit - d) // np.uint64(10):
+            return 0, False
+        value = value * np.uint64(10) + d
+        pos += 1
+    if neg:
+        return -np.int64(value), True
+    return np.int64(value), True
+
+
+@njit(nogil=True, cache=True)
+def _is_sep(c, delim):
+    return c == _SPACE or c == 9 or c == 13 or c == delim
+
+
+@njit(nogil=True, cache=True)
+def _count_lines(buf, start, stop, comment):
+    # count the lines holding data, blank and comment lines are skipped
+    count = 0
+    pos = start
+    while pos < stop:
+        while pos < stop and (buf[pos] == _SPACE or buf[pos] == 9 or buf[pos] == 13):
+            pos += 1
+        if pos < stop and buf[pos] != _NL and buf[pos] != comment:
+            count += 1
+        while pos < stop and buf[pos] != _NL:
+            pos += 1
+        pos += 1
+    return count
+
+
+@njit(nogil=True, cache=True)
+def _parse_chunk(buf, start, stop, comment, delim, spec, ints, floats, row, slow):
+    """Parse the lines of buf[start:stop] into the columns of `ints` and
+    `floats` starting at `row`.
+
+    `spec` has a (kind, column, offset) row for each field of a line,
+    integer fields are stored minus their offset and skipped fields are
+    not parsed.  Returns the number
+    of float tokens left for Python, whose (row, column, start, stop)
+    are stored in `slow` as long as it has room, and the byte offset
+    of the first malformed line or -1.
+
+    """
+    nslow = 0
+    nfields = spec.shape[0]
+    pos = start
+    while pos < stop:
+        eol = pos
+        while eol < stop and buf[eol] != _NL:
+            eol += 1
+        while pos < eol and (buf[pos] == _SPACE or buf[pos] == 9 or buf[pos] == 13):
+            pos += 1
+        if pos == eol or buf[pos] == comment:
+            pos = eol + 1
+            continue
+        line = pos
+        for f in range(nfields):
+            while pos < eol and _is_sep(buf[pos], delim):
+                pos += 1
+            end = pos
+            while end < eol and not _is_sep(buf[end], delim):
+                end += 1
+            if end == pos:
+                return nslow, line
+            kind = spec[f, 0]
+            col = spec[f, 1]
+            if kind == _INT or kind == _UINT:
+                value, ok = _parse_int(buf, pos, end, kind == _UINT)
+                if not ok:
+                    return nslow, line
+                ints[col, row] = value - spec[f, 2]
+            elif kind == _FLOAT:
+                fvalue, ok = _parse_float(buf, pos, end)
+                if ok:
+                    floats[col, row] = fvalue
+                else:
+                    if nslow < slow.shape[0]:
+                        slow[nslow, 0] = row
+                        slow[nslow, 1] = col
+                        slow[nslow, 2] = pos
+                        slow[nslow, 3] = end
+                    nslow += 1
+            pos = end
+        row += 1
+        pos = eol + 1
+    return nslow, -1
+
+
+def _chunks(data, start, nchunks):
+    """Split data[start:] into up to `nchunks` line-aligned (start, stop)
+    ranges.
+
+    """
+    size = len(data) - start
+    nchunks = max(1, min(nchunks, size // _min_chunk))
+    bounds = [start]
+    for k in range(1, nchunks):
+        pos = data.find(b"\n", start + size * k // nchunks)
+        if pos < 0:
+            break
+        if pos + 1 > bounds[-1]:
+            bounds.append(pos + 1)
+    bounds.append(len(data))
+    return [(a, b) for a, b in zip(bounds, bounds[1:]) if a < b]
+
+
+def _mmap(path):
+    """Map the file at `path` read only, empty files can't be mapped and
+    are returned as empty bytes.
+
+    """
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return b""
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def _skip_lines(data, start, nlines):
+    for _ in range(nlines):
+        pos = data.find(b"\n", start)
+        if pos < 0:
+            return len(data)
+        start = pos + 1
+    return start
+
+
+def _line_number(buf, offset):
+    return int(np.count_nonzero(buf[:offset] == _NL)) + 1
+
+
+def _parse(
+    data, start, spec, nints, nfloats, comment=b"%", delimiter=None, nthreads=None
+):
+    """Parse the lines of `data` after `start` in parallel.
+
+    `data` is a buffer that also supports `find`, like `mmap` or
+    `bytes`.  Returns a (nints, nlines) int64 array and a (nfloats,
+    nlines) float64 array.
+
+    """
+    if nthreads is None:
+        nthreads = os.cpu_count() or 1
+    buf = np.frombuffer(data, dtype=np.uint8)
+    comment = ord(comment) if comment else _NL
+    delim = ord(delimiter) if delimiter else _SPACE
+    spec = np.asarray(spec, dtype=np.int64).reshape(-1, 3)
+    chunks = _chunks(data, start, nthreads * 4)
+
+    with ThreadPoolExecutor(max(1, min(nthreads, len(chunks)))) as pool:
+        counts = list(
+            pool.map(lambda c: _count_lines(buf, c[0], c[1], comment), chunks)
+        )
+        offsets = np.concatenate(([0], np.cumsum(counts, dtype=np.int64)))
+        nlines = int(offsets[-1])
+        ints = np.empty((nints, nlines), dtype=np.int64)
+        floats = np.empty((nfloats, nlines), dtype=np.float64)
+
+        def parse(k, capacity=64):
+            a, b = chunks[k]
+            slow = np.empty((capacity, 4), dtype=np.int64)
+            nslow, bad = _parse_chunk(
+                buf, a, b, comment, delim, spec, ints, floats, offsets[k], slow,
+            )
+            if bad < 0 and nslow > capacity:
+                return parse(k, nslow)
+            return slow[:nslow], bad
+
+        results = list(pool.map(parse, range(len(chunks))))
+
+    for slow, bad in results:
+        if bad >= 0:
+            raise ValueError("Malformed line %d." % _line_number(buf, bad))
+        for row, col, a, b in slow.tolist():
+            try:
+                floats[col, row] = float(data[a:b])
+            except ValueError:
+                raise ValueError("Malformed line %d." % _line_number(buf, a)) from None
+    return ints, floats
+
+
+_fields = ("real", "double", "integer", "complex", "pattern")
+_symmetries = ("general", "symmetric", "skew-symmetric", "hermitian")
+
+
+def _read_header(data):
+    """Parse the banner, comments and size line of a Matrix Market file.
+
+    Returns the header fields and the offset where the entries start.
+
+    """
+    pos = data.find(b"\n") + 1 or len(data)
+    banner = data[:pos].decode("latin-1").split()
+    if len(banner) != 5 or banner[0] != "%%MatrixMarket":
+        raise ValueError("Not a Matrix Market file.")
+    obj, fmt, field, symmetry = (b.lower() for b in banner[1:])
+    if (
+        obj != "matrix"
+        or fmt not in ("coordinate", "array")
+        or field not in _fields
+        or symmetry not in _symmetries
+    ):
+        raise ValueError("Unsupported Matrix Market header %s." % " ".join(banner))
+    type_name = None
+    while pos < len(data):
+        end = data.find(b"\n", pos)
+        end = len(data) if end < 0 else end
+        line = data[pos:end].decode("latin-1").strip()
+        pos = end + 1
+        if line.startswith("%"):
+            if line.startswith("%%GraphBLAS"):
+                type_name = line.split()[1]
+            continue
+        if line:
+            size = [int(s) for s in line.split()]
+            break
+    else:
+        raise ValueError("Missing Matrix Market size line.")
+    if len(size) != (3 if fmt == "coordinate" else 2):
+        raise ValueError("Malformed Matrix Market size line.")
+    if field == "double":
+        field = "real"
+    return fmt, field, symmetry, type_name, size, min(pos, len(data))
+
+
+def _array_indices(nrows, ncols, symmetry):
+    # the column major order of the entries of a dense file
+    if symmetry == "general":
+        k = np.arange(nrows * ncols, dtype=np.int64)
+        return k % nrows, k // nrows
+    skip = 1 if symmetry == "skew-symmetric" else 0
+    cols = np.arange(ncols, dtype=np.int64)
+    counts = np.maximum(nrows - cols - skip, 0)
+    J = np.repeat(cols, counts)
+    starts = np.cumsum(counts) - counts
+    I = np.arange(len(J), dtype=np.int64) - np.repeat(starts - cols - skip, counts)
+    return I, J
+
+
+def _read_values(ints, floats, field):
+    if field == "integer":
+        return ints[-1]
+    if field == "real":
+        return floats[0]
+    if field == "complex":
+        X = np.empty(floats.shape[1], dtype=np.complex128)
+        X.real = floats[0]
+        X.imag = floats[1]
+        return X
+    return None
+
+
+def read_mm(path, nthreads=None):
+    """Read the Matrix Market file at `path` into an `MMData` tuple.
+
+    The file is parsed in parallel on `nthreads` threads, by default
+    one per CPU.  Coordinate and array files of every field (real,
+    integer, complex, pattern) and symmetry (general, symmetric,
+    skew-symmetric, hermitian) are supported.
+
+    """
+    data = _mmap(path)
+    fmt, field, symmetry, type_name, size, start = _read_header(data)
+    nvalues = {"integer": 1, "real": 1, "complex": 2, "pattern": 0}[field]
+    spec = []
+    if fmt == "coordinate":
+        spec += [(_INT, 0, 1), (_INT, 1, 1)]
+    if field == "integer":
+        unsigned = type_name is not None and "UINT" in type_name
+        spec.append((_UINT if unsigned else _INT, len(spec), 0))
+    else:
+        spec += [(_FLOAT, k, 0) for k in range(nvalues)]
+    nints = sum(1 for s in spec if s[0] != _FLOAT)
+    ints, floats = _parse(
+        data, start, spec, nints, len(spec) - nints, nthreads=nthreads
+    )
+
+    nrows, ncols = size[:2]
+    X = _read_values(ints, floats, field)
+    if fmt == "coordinate":
+        I, J = ints[0], ints[1]
+        if len(I) != size[2]:
+            raise ValueError("Expected %d entries, found %d." % (size[2], len(I)))
+    else:
+        I, J = _array_indices(nrows, ncols, symmetry)
+        if len(I) != ints.shape[1]:
+            raise ValueError("Expected %d entries, found %d." % (len(I), ints.shape[1]))
+
+    if symmetry != "general":
+        off = I != J
+        I, J = np.concatenate((I, J[off])), np.concatenate((J, I[off]))
+        if X is not None:
+            mirror = X[off]
+            if symmetry == "skew-symmetric":
+                mirror = -mirror
+            elif symmetry == "hermitian":
+                mirror = mirror.conj()
+            X = np.concatenate((X, mirror))
+    return MMData(nrows, ncols, I, J, X, field, symmetry, type_name)
+
+
+def read_edges(
+    path,
+    columns=(0, 1, 2),
+    base=1,
+    dtype=np.float64,
+    delimiter=None,
+    comment="#",
+    skiprows=0,
+    nthreads=None,
+):
+    """Read the edge list at `path` into (I, J, X) arrays.
+
+    Every line holds a row index, a column index and optionally a
+    value, at the field positions given by `columns`, other fields are
+    ignored.  With only two columns there are no values and X is None.
+    Indices are `base` based and are returned zero based, values are
+    returned as `dtype`.
+
+    Fields are separated by whitespace and `delimiter`, so empty
+    fields aren't supported.  The first `skiprows` lines and lines
+    starting with `comment` are skipped.  The file is parsed in
+    parallel on `nthreads` threads, by default one per CPU.
+
+    """
+    dtype = np.dtype(dtype)
+    if len(columns) not in (2, 3) or len(set(columns)) != len(columns):
+        raise ValueError("columns must be 2 or 3 distinct field positions.")
+    if len(columns) == 3 and dtype.kind not in "biuf":
+        raise TypeError("Cannot read values of type %s." % dtype)
+    kinds = [(_INT, 0, base), (_INT, 1, base)]
+    if len(columns) == 3:
+        if dtype.kind == "f":
+            kinds.append((_FLOAT, 0, 0))
+        else:
+            kinds.append((_UINT if dtype.kind == "u" else _INT, 2, 0))
+    spec = [(_SKIP, 0, 0)] * (max(columns) + 1)
+    for field, kind in zip(columns, kinds):
+        spec[field] = kind
+    nints = sum(1 for s in kinds if s[0] != _FLOAT)
+
+    data = _mmap(path)
+    start = _skip_lines(data, 0, skiprows)
+    ints, floats = _parse(
+        data, start, spec, nints, len(kinds) - nints, comment, delimiter, nthreads
+    )
+    X = None
+    if len(columns) == 3:
+        X = (floats[0] if dtype.kind == "f" else ints[2]).astype(dtype, copy=False)
+    return ints[0], ints[1], X
+
+
+def _cached_powers():
+    # 64 bit normalized powers of ten from 1e-300 to 1e324 in steps of
+    # 8 with their binary exponents, rounded to nearest, see Loitsch,
+    # "Printing Floating-Point Numbers Quickly and Accurately with
+    # Integers" (2010).
+    ks = range(-300, 325, 8)
+    table = np.empty((len(ks), 2), dtype=np.int64)
+    for n, k in enumerate(ks):
+        num, den = (10 ** k, 1) if k >= 0 else (1, 10 ** -k)
+        e = num.bit_length() - den.bit_length() - 64
+        while True:
+            if e >= 0:
+                f = (2 * num + (den << e)) // (2 * den << e)
+            else:
+                f = ((2 * num << -e) + den) // (2 * den)
+            if f >= 1 << 64:
+                e += 1
+            elif f < 1 << 63:
+                e -= 1
+            else:
+                break
+        table[n] = (np.uint64(f).view(np.int64), e)
+    return table
+
+
+_powers = _cached_powers()
+_powers_f = _powers[:, 0].view(np.uint64).copy()
+_powers_e = _powers[:, 1].copy()
+del _powers
+
+_ONE = np.uint64(1)
+_TEN = np.uint64(10)
+_SIGN = np.uint64(1 << 63)
+
+# value kinds of the line formatter, values are passed as uint64 bits
+_W_INT = 0
+_W_UINT = 1
+_W_DOUBLE = 2
+_W_SINGLE = 3
+
+
+@njit(nogil=True, cache=True)
+def _write_uint(out, pos, u):
+    n = 1
+    t = u
+    while t >= _TEN:
+        t //= _TEN
+        n += 1
+    end = pos + n
+    for i in range(end - 1, pos - 1, -1):
+        out[i] = 48 + u % _TEN
+        u //= _TEN
+    return end
+
+
+@njit(nogil=True, cache=True)
+def _write_int(out, pos, bits):
+    if bits & _SIGN:
+        out[pos] = 45
+        return _write_uint(out, pos + 1, ~bits + _ONE)
+    return _write_uint(out, pos, bits)
+
+
+@njit(nogil=True, cache=True)
+def _normalize(f, e):
+    for shift in (32, 16, 8, 4, 2, 1):
+        if f >> np.uint64(64 - shift) == np.uint64(0):
+            f <<= np.uint64(shift)
+            e -= shift
+    return f, e
+
+
+@njit(nogil=True, cache=True)
+def _mul_round(a, b):
+    hi, lo = _mul128(a, b)
+    return hi + (lo >> np.uint64(63))
+
+
+@njit(nogil=True, cache=True)
+def _grisu2(out, pos, bits, precision, bias):
+    # Writes the digits of the positive finite non zero float with the
+    # given bits to out[pos:], returns the number of digits and the
+    # decimal exponent of the last one.  The digits are the shortest
+    # that round trip in all but rare cases, see Loitsch (2010).
+    hidden = _ONE << np.uint64(precision - 1)
+    F = bits & (hidden - _ONE)
+    E = int(bits >> np.uint64(precision - 1))
+    if E == 0:
+        vf, ve = F, 1 - bias
+    else:
+        vf, ve = F + hidden, E - bias
+    if F == 0 and E > 1:
+        mf, me = np.uint64(4) * vf - _ONE, ve - 2
+    else:
+        mf, me = np.uint64(2) * vf - _ONE, ve - 1
+    pf, pe = _normalize(np.uint64(2) * vf + _ONE, ve - 1)
+    mf <<= np.uint64(me - pe)
+    vf, ve = _normalize(vf, ve)
+
+    # a cached power of ten c such that the exponent of w * c is in
+    # [-60, -32]
+    t = -61 - pe
+    k = t * 78913
+    k = (k >> 18 if k >= 0 else -((-k) >> 18)) + (1 if t > 0 else 0)
+    index = (300 + k + 7) // 8
+    cf = _powers_f[index]
+    e = pe + _powers_e[index] + 64
+    exponent = 300 - 8 * index
+
+    wf = _mul_round(vf, cf)
+    low = _mul_round(mf, cf) + _ONE
+    high = _mul_round(pf, cf) - _ONE
+
+    delta = high - low
+    dist = high - wf
+    shift = np.uint64(-e)
+    one = _ONE << shift
+    p1 = high >> shift
+    p2 = high & (one - _ONE)
+
+    power = np.uint64(1)
+    n = 1
+    while n < 20 and p1 >= power * _TEN:
+        power *= _TEN
+        n += 1
+
+    ndigits = 0
+    while n > 0:
+        out[pos + ndigits] = 48 + p1 // power
+        ndigits += 1
+        p1 %= power
+        n -= 1
+        rest = (p1 << shift) + p2
+        if rest <= delta:
+            exponent += n
+            _grisu2_round(out, pos + ndigits - 1, dist, delta, rest, power << shift)
+            return ndigits, exponent
+        power //= _TEN
+
+    while True:
+        p2 *= _TEN
+        out[pos + ndigits] = 48 + (p2 >> shift)
+        ndigits += 1
+        p2 &= one - _ONE
+        delta *= _TEN
+        dist *= _TEN
+        exponent -= 1
+        if p2 <= delta:
+            break
+    _grisu2_round(out, pos + ndigits - 1, dist, delta, p2, one)
+    return ndigits, exponent
+
+
+@njit(nogil=True, cache=True)
+def _grisu2_round(out, last, dist, delta, rest, ten_k):
+    while (
+        rest < dist
+        and delta - rest >= ten_k
+        and (rest + ten_k < dist or dist - rest > rest + ten_k - dist)
+    ):
+        out[last] -= 1
+        rest += ten_k
+
+
+@njit(nogil=True, cache=True)
+def _write_float(out, pos, bits, precision, exponent_bits):
+    sign = _ONE << np.uint64(precision + exponent_bits - 1)
+    special = (_ONE << np.uint64(exponent_bits)) - _ONE
+    if (bits >> np.uint64(precision - 1)) & special == special:
+        if bits & ((_ONE << np.uint64(precision - 1)) - _ONE):
+            out[pos] = 110
+            out[pos + 1] = 97
+            out[pos + 2] = 110
+            return pos + 3
+        if bits & sign:
+            out[pos] = 45
+            pos += 1
+        out[pos] = 105
+        out[pos + 1] = 110
+        out[pos + 2] = 102
+        return pos + 3
+    if bits & sign:
+        out[pos] = 45
+        pos += 1
+        bits ^= sign
+    if bits == 0:
+        out[pos] = 48
+        return pos + 1
+    bias = (1 << (exponent_bits - 1)) + precision - 2
+    k, exponent = _grisu2(out, pos, bits, precision, bias)
+    n = k + exponent
+    if k <= n <= 16:
+        # digits then zeros, 1234500
+        out[pos + k : pos + n] = 48
+        return pos + n
+    if 0 < n <= 16:
+        # 1234.5
+        for i in range(pos + k, pos + n, -1):
+            out[i] = out[i - 1]
+        out[pos + n] = 46
+        return pos + k + 1
+    if -5 < n <= 0:
+        # 0.0012345
+        zeros = 2 - n
+        for i in range(pos + k - 1, pos - 1, -1):
+            out[i + zeros] = out[i]
+        out[pos] = 48
+        out[pos + 1] = 46
+        out[pos + 2 : pos + zeros] = 48
+        return pos + k + zeros
+    # 1.2345e-7
+    end = pos + 1
+    if k > 1:
+        for i in range(pos + k, pos + 1, -1):
+            out[i] = out[i - 1]
+        out[pos + 1] = 46
+        end = pos + k + 1
+    out[end] = 101
+    n -= 1
+    if n < 0:
+        out[end + 1] = 45
+        return _write_uint(out, end + 2, np.uint64(-n))
+    return _write_uint(out, end + 1, np.uint64(n))
+
+
+@njit(nogil=True, cache=True)
+def _format_lines(I, J, X, kind, base):
+    # Formats the coordinate lines of (I, J, X) as text.  Values are
+    # uint64 bits of the given kind, X has one column per value of a
+    # line.
+    width = 43 + 26 * X.shape[1]
+    out = np.empty(len(I) * width, dtype=np.uint8)
+    pos = 0
+    for k in range(len(I)):
+        pos = _write_uint(out, pos, I[k] + base)
+        out[pos] = _SPACE
+        pos = _write_uint(out, pos + 1, J[k] + base)
+        for c in range(X.shape[1]):
+            out[pos] = _SPACE
+            bits = X[k, c]
+            if kind == _W_INT:
+                pos = _write_int(out, pos + 1, bits)
+            elif kind == _W_UINT:
+                pos = _write_uint(out, pos + 1, bits)
+            elif kind == _W_DOUBLE:
+                pos = _write_float(out, pos + 1, bits, 53, 11)
+            else:
+                pos = _write_float(out, pos + 1, bits, 24, 8)
+        out[pos] = _NL
+        pos += 1
+    return out[:pos]
+
+
+# lines per formatting job
+_lines_per_chunk = 1 << 16
+
+
+def _value_bits(X):
+    # The values X as (kind, uint64 bits with one column per value).
+    if X.dtype.kind == "c":
+        X = X.view(X.real.dtype).reshape(len(X), 2)
+    else:
+        X = X.reshape(len(X), 1)
+    if X.dtype == np.float64:
+        return _W_DOUBLE, X.view(np.uint64)
+    if X.dtype == np.float32:
+        return _W_SINGLE, X.view(np.uint32).astype(np.uint64)
+    if X.dtype.kind == "u":
+        return _W_UINT, X.astype(np.uint64)
+    return _W_INT, X.astype(np.int64).view(np.uint64)
+
+
+def _mm_header(nrows, ncols, nvals, type_name):
+    if type_name.startswith("FC"):
+        field, prefix = "complex", "GxB"
+    elif type_name.startswith("FP"):
+        field, prefix = "real", "GrB"
+    else:
+        field, prefix = "integer", "GrB"
+    return (
+        "%%%%MatrixMarket matrix coordinate %s general\n"
+        "%%%%GraphBLAS %s_%s\n"
+        "%d %d %d\n" % (field, prefix, type_name, nrows, ncols, nvals)
+    ).encode("ascii")
+
+
+def _open_target(target):
+    if hasattr(target, "write"):
+        return contextlib.nullcontext(target)
+    if os.fsdecode(target).endswith(".gz"):
+        return gzip.open(target, "wb")
+    return open(target, "wb")
+
+
+def write_mm(target, nrows, ncols, nvals, blocks, type_name, nthreads=None):
+    """Write a coordinate Matrix Market file to `target`.
+
+    `blocks` yields the `(I, J, X)` numpy arrays of the `nvals` entries
+    of a `nrows` by `ncols` matrix, like `Matrix.iterblocks`.  Booleans
+    and integers are written in the integer field, floats in the real
+    field with the shortest digits that read back to the same value,
+    and the GraphBLAS `type_name` is recorded in a `%%GraphBLAS`
+    comment.
+
+    Lines are formatted in parallel on `nthreads` threads, by default
+    one per CPU, and written in large buffers.  `target` is a path,
+    compressed with gzip if it ends with ".gz", or any binary file
+    object such as a pipe or a `gzip.GzipFile`.
+
+    """
+    nthreads = nthreads or os.cpu_count() or 1
+    base = np.uint64(1)
+
+    def format_lines(I, J, X):
+        kind, bits = _value_bits(X)
+        return _format_lines(
+            I.astype(np.uint64, copy=False),
+            J.astype(np.uint64, copy=False),
+            bits,
+            kind,
+            base,
+        )
+
+    with _open_target(target) as f, ThreadPoolExecutor(nthreads) as pool:
+        f.write(_mm_header(nrows, ncols, nvals, type_name))
+        pending = deque()
+        for I, J, X in blocks:
+            for start in range(0, len(I), _lines_per_chunk):
+                stop = start + _lines_per_chunk
+                pending.append(
+                    pool.submit(
+                        format_lines, I[start:stop], J[start:stop], X[start:stop]
+                    )
+                )
+                while len(pending) > 2 * nthreads:
+                    f.write(pending.popleft().result())
+        while pending:
+            f.write(pending.popleft().result())
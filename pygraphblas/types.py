@@ -2,6 +2,7 @@ from .base import lib, _check, ffi
 from textwrap import dedent
 from operator import methodcaller, itemgetter
 from functools import partial
+import numpy as np
 import numba
 from numba import cfunc, jit, carray
 from numba.core.typing import cffi_utils as cffi_support
@@ -27,6 +28,23 @@ __all__ = [
     "promote",
 ]
 
+# the builtin type names that automatic operators are looked up for,
+# binary operators and monoids are only searched over the real types
+_real_names = (
+    "BOOL",
+    "UINT8",
+    "UINT16",
+    "UINT32",
+    "UINT64",
+    "INT8",
+    "INT16",
+    "INT32",
+    "INT64",
+    "FP32",
+    "FP64",
+)
+_builtin_names = _real_names + ("FC32", "FC64")
+
 
 class classproperty(object):
     def __init__(self, f):
@@ -43,6 +61,8 @@ def gb_type_to_type(gb_type):
 class MetaType(type):
 
     _gb_type_map = {}
+    _dtype_map = {}
+    _missing = set()
 
     def __new__(meta, type_name, bases, attrs):
         if attrs.get("base", False):
@@ -66,6 +86,8 @@ class MetaType(type):
 
         cls = super().__new__(meta, type_name, bases, attrs)
         meta._gb_type_map[cls.gb_type] = cls
+        if attrs.get("dtype") is not None:
+            meta._dtype_map[attrs["dtype"]] = cls
         cls.ptr = cls.C + "*"
         cls.zero = getattr(cls, "zero", core_ffi.NULL)
         cls.one = getattr(cls, "one", core_ffi.NULL)
@@ -77,6 +99,7 @@ class MetaType(type):
         cls.Matrix_extractElement = get(
             "{}_Matrix_extractElement_{}".format(prefix, base_name)
         )
+        cls.Matrix_build = get("{}_Matrix_build_{}".format(prefix, base_name))
         cls.Matrix_extractTuples = get(
             "{}_Matrix_extractTuples_{}".format(prefix, base_name)
         )
@@ -91,6 +114,7 @@ class MetaType(type):
         cls.Vector_extractElement = get(
             "{}_Vector_extractElement_{}".format(prefix, base_name)
         )
+        cls.Vector_build = get("{}_Vector_build_{}".format(prefix, base_name))
         cls.Vector_extractTuples = get(
             "{}_Vector_extractTuples_{}".format(prefix, base_name)
         )
@@ -107,6 +131,28 @@ class MetaType(type):
         )
         return cls
 
+    def __getattr__(cls, name):
+        # builtin operators are created on first use, `INT64.PLUS` is
+        # the operator `binaryop.PLUS_INT64` and so on.
+        if not name.isupper() or (cls, name) in MetaType._missing:
+            raise AttributeError("type %s has no attribute %r" % (cls.__name__, name))
+        from . import unaryop, binaryop, monoid, semiring
+
+        if name.endswith("_MONOID"):
+            op = name[: -len("_MONOID")]
+            found = monoid._resolve("_".join((op, cls.__name__, "monoid")))
+        else:
+            typed = "_".join((name, cls.__name__))
+            found = (
+                unaryop._resolve(typed, auto=False)
+                or binaryop._resolve(typed, auto=False)
+                or semiring._resolve(typed, auto=False)
+            )
+        if found is None:
+            MetaType._missing.add((cls, name))
+            raise AttributeError("type %s has no attribute %r" % (cls.__name__, name))
+        return found
+
     def new_monoid(cls, op, identity):
         monoid = core_ffi.new("GrB_Monoid[1]")
         if cls.base_name == "UDT":
@@ -131,6 +177,7 @@ class Type(metaclass=MetaType):
     zero = 0
     base = True
     typecode = None
+    dtype = None
 
     @classmethod
     def format_value(cls, val, width=2):
@@ -159,6 +206,7 @@ class BOOL(Type):
     zero = False
     typecode = "B"
     numba_t = numba.boolean
+    dtype = np.dtype(np.bool_)
 
     @classmethod
     def format_value(cls, val, width=2):
@@ -197,6 +245,7 @@ class INT8(Type):
     C = "int8_t"
     typecode = "b"
     numba_t = numba.int8
+    dtype = np.dtype(np.int8)
 
 
 class UINT8(Type):
@@ -204,6 +253,7 @@ class UINT8(Type):
     C = "uint8_t"
     typecode = "B"
     numba_t = numba.uint8
+    dtype = np.dtype(np.uint8)
 
 
 class INT16(Type):
@@ -211,6 +261,7 @@ class INT16(Type):
     C = "int16_t"
     typecode = "i"
     numba_t = numba.int16
+    dtype = np.dtype(np.int16)
 
 
 class UINT16(Type):
@@ -218,6 +269,7 @@ class UINT16(Type):
     C = "uint16_t"
     typecode = "I"
     numba_t = numba.uint16
+    dtype = np.dtype(np.uint16)
 
 
 class INT32(Type):
@@ -225,6 +277,7 @@ class INT32(Type):
     C = "int32_t"
     typecode = "l"
     numba_t = numba.int32
+    dtype = np.dtype(np.int32)
 
 
 class UINT32(Type):
@@ -232,6 +285,7 @@ class UINT32(Type):
     C = "uint32_t"
     typecode = "L"
     numba_t = numba.uint32
+    dtype = np.dtype(np.uint32)
 
 
 class INT64(Type):
@@ -239,6 +293,7 @@ class INT64(Type):
     C = "int64_t"
     typecode = "q"
     numba_t = numba.int64
+    dtype = np.dtype(np.int64)
 
 
 class UINT64(Type):
@@ -246,6 +301,7 @@ class UINT64(Type):
     C = "uint64_t"
     typecode = "Q"
     numba_t = numba.uint64
+    dtype = np.dtype(np.uint64)
 
 
 class FP32(Type):
@@ -255,6 +311,7 @@ class FP32(Type):
     C = "float"
     typecode = "f"
     numba_t = numba.float32
+    dtype = np.dtype(np.float32)
 
 
 class FP64(Type):
@@ -264,6 +321,7 @@ class FP64(Type):
     C = "double"
     typecode = "d"
     numba_t = numba.float64
+    dtype = np.dtype(np.float64)
 
 
 class FC32(Type):
@@ -273,6 +331,7 @@ class FC32(Type):
     gb_type = lib.GxB_FC32
     C = "float _Complex"
     numba_t = numba.complex64
+    dtype = np.dtype(np.complex64)
 
 
 class FC64(Type):
@@ -282,6 +341,7 @@ class FC64(Type):
     gb_type = lib.GxB_FC64
     C = "double _Complex"
     numba_t = numba.complex128
+    dtype = np.dtype(np.complex128)
 
 
 # class Complex(Type):
@@ -314,6 +374,47 @@ def _gb_from_type(typ):
     return typ
 
 
+def _gb_from_dtype(dtype):
+    return MetaType._dtype_map[np.dtype(dtype)]
+
+
+def _gb_from_name(name):
+    """The builtin type called `name`, raises `ValueError` for any other
+    name, as read from the header of a file.
+
+    """
+    typ = globals().get(name)
+    if not isinstance(typ, MetaType) or typ.dtype is None:
+        raise ValueError("Unknown type %s." % name)
+    return typ
+
+
+def _gb_from_values(V):
+    """Infer the GraphBLAS type of a sequence of values.  Objects that
+    carry a dtype or support the buffer protocol are typed from their
+    format, plain sequences from their first element.
+
+    """
+    if hasattr(V, "dtype"):
+        return _gb_from_dtype(V.dtype)
+    if isinstance(V, (list, tuple)):
+        if isinstance(V[0], np.generic):
+            return _gb_from_dtype(type(V[0]))
+        return _gb_from_type(type(V[0]))
+    return _gb_from_dtype(np.asarray(V).dtype)
+
+
+def _is_buildable(typ):
+    """True if values of `typ` can be handed to GraphBLAS as a raw buffer
+    without a per-element `from_value` conversion.
+
+    """
+    return (
+        typ.dtype is not None
+        and typ.from_value.__func__ is Type.from_value.__func__
+    )
+
+
 def udt_head(name):
     return dedent(
         """
@@ -47,7 +47,12 @@ class AutoUnaryOp(UnaryOp):
         self.token = None
 
     def get_unaryop(self, operand1=None):
-        return UnaryOp._auto_unaryops[self.name][operand1.gb_type]
+        gb_type = operand1.gb_type
+        ops = UnaryOp._auto_unaryops[self.name]
+        if gb_type not in ops:
+            typ = types.gb_type_to_type(gb_type)
+            _resolve("_".join((self.name, typ.__name__)))
+        return ops[gb_type]
 
 
 __all__ = ["UnaryOp", "AutoUnaryOp", "unary_op", "current_uop"]
@@ -70,6 +75,12 @@ def uop_group(reg):
 
 
 def build_unaryops():
+    """Create every builtin unary operator now.
+
+    This is not needed for normal use, operators are created on first
+    access through the module or type attribute of the same name.
+
+    """
     this = sys.modules[__name__]
     for r in chain(uop_group(uop_re)):
         setattr(this, r.name, r)
@@ -78,6 +89,43 @@ def build_unaryops():
         setattr(this, name, bo)
 
 
+def _lib_unaryop(op, typ):
+    # GxB names are preferred, like the sorted scan in build_unaryops
+    for prefix in ("GxB", "GrB"):
+        name = "_".join((prefix, op, typ))
+        if uop_re.match(name):
+            func = getattr(lib, name, None)
+            if func is not None:
+                return func
+    return None
+
+
+def _resolve(name, auto=True):
+    """Create the operator called `name`, or return None if there is no
+    such builtin operator.  Automatic operators are only tried if `auto`
+    is true.
+
+    """
+    this = sys.modules[__name__]
+    op, _, typ = name.rpartition("_")
+    func = _lib_unaryop(op, typ) if op else None
+    if func is not None:
+        result = UnaryOp(op, typ, func)
+    elif auto and any(_lib_unaryop(name, t) is not None for t in types._builtin_names):
+        result = AutoUnaryOp(name)
+    else:
+        return None
+    setattr(this, name, result)
+    return result
+
+
+def __getattr__(name):
+    result = _resolve(name)
+    if result is None:
+        raise AttributeError("module %r has no attribute %r" % (__name__, name))
+    return result
+
+
 def _uop_name(name):
     return "_{0}_uop_function".format(name)
 
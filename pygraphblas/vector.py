@@ -1,6 +1,7 @@
-import operator
+import copyreg
 import weakref
-from array import array
+
+import numpy as np
 
 from .base import (
     lib,
@@ -8,6 +9,12 @@ from .base import (
     NULL,
     NoValue,
     _check,
+    _index_array,
+    _malloc_array,
+    _gc_array,
+    _from_buffer,
+    _pickle_buffers,
+    _to_array,
     _get_bin_op,
     _get_select_op,
     _build_range,
@@ -19,6 +26,7 @@ from .binaryop import BinaryOp, current_accum, current_binop
 from .unaryop import UnaryOp
 from .monoid import Monoid, current_monoid
 from . import descriptor
+from .expr import deferrable
 from .descriptor import Descriptor, Default, TransposeB
 
 __all__ = ["Vector"]
@@ -31,7 +39,7 @@ class Vector:
 
     """
 
-    __slots__ = ("vector", "type", "_keep_alives")
+    __slots__ = ("vector", "type", "_keep_alives", "_size", "_nvals")
 
     def __init__(self, vec, typ=None):
         if typ is None:
@@ -43,6 +51,8 @@ class Vector:
         self.vector = vec
         self.type = typ
         self._keep_alives = weakref.WeakKeyDictionary()
+        self._size = None
+        self._nvals = None
 
     def __del__(self):
         _check(lib.GrB_Vector_free(self.vector))
@@ -51,6 +61,8 @@ class Vector:
         return self.nvals
 
     def __iter__(self):
+        if self.type.dtype is not None:
+            return self._iter_batches()
         nvals = self.nvals
         _nvals = ffi.new("GrB_Index[1]", [nvals])
         I = ffi.new("GrB_Index[%s]" % nvals)
@@ -58,6 +70,11 @@ class Vector:
         _check(self.type.Vector_extractTuples(I, X, _nvals, self.vector[0]))
         return zip(I, X)
 
+    def _iter_batches(self, size=1 << 16):
+        # convert one batch at a time to Python objects
+        for I, X in self.iterbatches(size):
+            yield from zip(I.tolist(), X.tolist())
+
     def iseq(self, other, eq_op=None):
         if eq_op is None:
             eq_op = self.type.EQ.get_binaryop(self.type, other.type)
@@ -77,40 +94,175 @@ class Vector:
         """
         new_vec = ffi.new("GrB_Vector*")
         _check(lib.GrB_Vector_new(new_vec, typ.gb_type, size))
-        return cls(new_vec, typ)
+        v = cls(new_vec, typ)
+        v._size = size
+        return v
 
     @classmethod
-    def from_lists(cls, I, V, size=None, typ=None):
+    def from_lists(cls, I, V, size=None, typ=None, dup_op=None):
         """Create a new vector from the given lists of indices and values.  If
         size is not provided, it is computed from the max values of
         the provides size indices.
 
+        The lists can also be any objects supporting the buffer
+        protocol, the vector is built with one call to
+        `GrB_Vector_build`, duplicate entries are combined with
+        `dup_op`, by default the last value wins.
+
         """
         assert len(I) == len(V)
         assert len(I) > 0  # must be non empty
-        if not size:
-            size = max(I) + 1
-        # TODO option to use ffi and GrB_Vector_build
         if typ is None:
-            typ = types._gb_from_type(type(V[0]))
+            typ = types._gb_from_values(V)
+        I = _index_array(I)
+        if not size:
+            size = int(I.max()) + 1
         m = cls.sparse(typ, size)
-        for i, v in zip(I, V):
-            m[i] = v
+        m.build(I, V, dup_op)
         return m
 
     @classmethod
     def from_list(cls, I):
-        """Create a new dense vector from the given lists of values.
+        """Create a new dense vector from the given lists of values.  Any
+        object supporting the buffer protocol can be used instead of a
+        list.
 
         """
         size = len(I)
         assert size > 0
-        # TODO use ffi and GrB_Vector_build
-        m = cls.sparse(types._gb_from_type(type(I[0])), size)
-        for i, v in enumerate(I):
-            m[i] = v
+        m = cls.sparse(types._gb_from_values(I), size)
+        m.build(np.arange(size, dtype=np.uint64), I)
         return m
 
+    def build(self, I, V, dup_op=None):
+        """Build the vector from the given indices and values with
+        `GrB_Vector_build`.  The vector must be empty.
+
+        Entries with the same index are combined with `dup_op`, which
+        defaults to `SECOND`.
+
+        """
+        if not types._is_buildable(self.type):
+            for i, v in zip(I, V):
+                self[int(i)] = v
+            return
+        if dup_op is None:
+            dup_op = binaryop.SECOND
+        if isinstance(dup_op, BinaryOp):
+            dup_op = dup_op.get_binaryop(self.type)
+        I = _index_array(I)
+        X = np.ascontiguousarray(V, dtype=self.type.dtype)
+        _check(
+            self.type.Vector_build(
+                self.vector[0],
+                ffi.from_buffer("GrB_Index[]", I),
+                ffi.from_buffer(self.type.C + "[]", X),
+                len(X),
+                dup_op,
+            )
+        )
+
+    @classmethod
+    def from_buffers(cls, indices, values, size, typ=None):
+        """Create a new vector from sorted, duplicate free indices and
+        their values with `GxB_Vector_import`.
+
+        The buffers are copied once into memory owned by GraphBLAS,
+        which imports them in constant time.
+
+        """
+        if typ is None:
+            typ = types._gb_from_values(values)
+        if typ.dtype is None:
+            raise TypeError("Cannot import values of type %s." % typ.__name__)
+        nvals = len(values)
+        if len(indices) != nvals:
+            raise ValueError(
+                "Import needs len(indices) == len(values), got %d and %d."
+                % (len(indices), nvals)
+            )
+        if nvals and not 0 <= int(np.min(indices)) <= int(np.max(indices)) < size:
+            raise ValueError("Index out of range for a vector of size %d." % size)
+        vi = _malloc_array(indices, np.uint64, "GrB_Index")
+        vx = _malloc_array(values, typ.dtype)
+        v = ffi.new("GrB_Vector*")
+        try:
+            _check(lib.GxB_Vector_import(v, typ.gb_type, size, nvals, vi, vx, NULL))
+        finally:
+            # on success GraphBLAS owns the buffers and NULLs the pointers
+            for p in (vi, vx):
+                if p[0] != NULL:
+                    lib.free(p[0])
+        return cls(v, typ)
+
+    @classmethod
+    def from_blockfile(cls, path, nthreads=None):
+        """Create a new vector from a compressed file written by
+        `to_blockfile`, decompressing its blocks in parallel on
+        `nthreads` threads.
+
+        """
+        from . import blockio
+
+        result = blockio.load(path, nthreads)
+        if not isinstance(result, Vector):
+            raise TypeError("%s does not hold a Vector." % path)
+        return result
+
+    def to_blockfile(
+        self, path, codec="zlib", level=None, block_size=1 << 20, nthreads=None
+    ):
+        """Write this vector to a compressed file, see
+        `Matrix.to_blockfile`.
+
+        """
+        from . import blockio
+
+        blockio.save(self, path, codec, level, block_size, nthreads)
+
+    def export(self):
+        """Move the contents of the vector out as `(indices, values)` numpy
+        arrays with `GxB_Vector_export`, without copying.  The vector
+        is left empty.
+
+        """
+        if self.type.dtype is None:
+            raise TypeError("Cannot export values of type %s." % self.type.__name__)
+        typ = ffi.new("GrB_Type*")
+        n = ffi.new("GrB_Index*")
+        nvals = ffi.new("GrB_Index*")
+        vi = ffi.new("GrB_Index**")
+        vx = ffi.new("void**")
+        _check(lib.GxB_Vector_export(self.vector, typ, n, nvals, vi, vx, NULL))
+        _check(lib.GrB_Vector_new(self.vector, typ[0], n[0]))
+        return (
+            _gc_array(vi[0], nvals[0], np.uint64),
+            _gc_array(vx[0], nvals[0], self.type.dtype),
+        )
+
+    def __getstate__(self):
+        """Return the type name, size and the exported `(indices, values)`
+        arrays of a copy of the vector.
+
+        """
+        return (self.type.__name__, self.size, self.dup().export())
+
+    def __setstate__(self, state):
+        type_name, size, (I, X) = state
+        typ = getattr(types, type_name)
+        v = self.from_buffers(
+            np.frombuffer(I, np.uint64), np.frombuffer(X, typ.dtype), size, typ
+        )
+        self.__init__(v.vector, typ)
+        self._size = size
+        v.vector = ffi.new("GrB_Vector*")
+
+    def __reduce_ex__(self, protocol):
+        # see Matrix.__reduce_ex__
+        type_name, size, arrays = self.__getstate__()
+        state = (type_name, size, _pickle_buffers(arrays, protocol))
+        return copyreg.__newobj__, (type(self),), state
+
     @classmethod
     def from_1_to_n(cls, n):
         new_vec = ffi.new("GrB_Vector*")
@@ -139,6 +291,8 @@ class Vector:
         """Extract the indices and values of the Vector as 2 lists.
 
         """
+        if self.type.dtype is not None:
+            return [A.tolist() for A in self.to_numpy()]
         I = ffi.new("GrB_Index[]", self.nvals)
         V = self.type.ffi.new(self.type.C + "[]", self.nvals)
         n = ffi.new("GrB_Index*")
@@ -146,24 +300,66 @@ class Vector:
         _check(self.type.Vector_extractTuples(I, V, n, self.vector[0]))
         return [list(I), list(map(self.type.to_value, V))]
 
+    def to_numpy(self, indices=True, vals=True):
+        """Extract the indices and values of the Vector as 2 numpy arrays
+        with one call to `GrB_Vector_extractTuples`.
+
+        Parts passed as False are not extracted and returned as None.
+
+        """
+        if vals and self.type.dtype is None:
+            raise TypeError("Cannot extract values of type %s." % self.type.__name__)
+        nvals = self.nvals
+        n = ffi.new("GrB_Index*", nvals)
+        I = np.empty(nvals, np.uint64) if indices else None
+        X = np.empty(nvals, self.type.dtype) if vals else None
+        _check(
+            self.type.Vector_extractTuples(
+                _from_buffer("GrB_Index[]", I),
+                _from_buffer(self.type.C + "[]", X),
+                n,
+                self.vector[0],
+            )
+        )
+        return I, X
+
+    def iterbatches(self, size=1 << 20):
+        """Iterate over the Vector in batches of at most `size` entries.
+
+        Each batch is a tuple of numpy arrays `(I, X)`, slices of one
+        extraction of the whole vector.
+
+        """
+        I, X = self.to_numpy()
+        for start in range(0, len(I), size):
+            stop = start + size
+            yield I[start:stop], X[start:stop]
+
     def to_arrays(self):
+        """Extract the indices and values of the Vector as 2
+        `array.array` columns, copied in bulk from the arrays of
+        `to_numpy`.
+
+        """
         if self.type.typecode is None:
             raise TypeError("This matrix has no array typecode.")
-        nvals = self.nvals
-        _nvals = ffi.new("GrB_Index[1]", [nvals])
-        I = ffi.new("GrB_Index[%s]" % nvals)
-        X = self.type.ffi.new("%s[%s]" % (self.type.C, nvals))
-        _check(self.type.Vector_extractTuples(I, X, _nvals, self.vector[0]))
-        return array("L", I), array(self.type.typecode, X)
+        I, X = self.to_numpy()
+        return _to_array(I, "L"), _to_array(X, self.type.typecode)
 
     @property
     def size(self):
         """Return the size of the vector.
 
+        The size is only queried from GraphBLAS once, it can only
+        change through `resize`.
+
         """
-        n = ffi.new("GrB_Index*")
-        _check(lib.GrB_Vector_size(n, self.vector[0]))
-        return n[0]
+        size = self._size
+        if size is None:
+            n = ffi.new("GrB_Index*")
+            _check(lib.GrB_Vector_size(n, self.vector[0]))
+            size = self._size = n[0]
+        return size
 
     @property
     def shape(self):
@@ -177,7 +373,9 @@ class Vector:
         """Return the number of values in the vector.
 
         """
-        n = ffi.new("GrB_Index*")
+        n = self._nvals
+        if n is None:
+            n = self._nvals = ffi.new("GrB_Index*")
         _check(lib.GrB_Vector_nvals(n, self.vector[0]))
         return n[0]
 
@@ -186,9 +384,7 @@ class Vector:
         """Return the GraphBLAS low-level type object of the Vector.
 
         """
-        typ = ffi.new("GrB_Type*")
-        _check(lib.GxB_Vector_type(typ, self.vector[0]))
-        return typ[0]
+        return self.type.gb_type
 
     def full(self, identity=None):
         B = self.__class__.sparse(self.type, self.size)
@@ -202,42 +398,51 @@ class Vector:
         )
         return self.eadd(B, binaryop.FIRST)
 
-    def compare(self, other, op, strop):
+    def compare(self, other, strop, fill=None):
+        """Compare this vector to a scalar or another vector.
+
+        Comparing to a scalar returns a BOOL vector holding True for
+        the stored entries the comparison holds for, like `select`,
+        so the result can be used as a mask.  Comparing to another
+        vector compares the intersection of the two patterns, unless
+        `fill` is given, then the union is compared and an entry
+        missing from one side is taken to be `fill`.  The comparison
+        never builds a dense intermediate.
+
+        """
         C = self.__class__.sparse(types.BOOL, self.size)
         if isinstance(other, (bool, int, float)):
-            if op(other, 0):
-                B = self.__class__.dup(self)
-                B[:] = other
-                self.emult(B, strop, out=C)
-                return C
-            else:
-                self.select(strop, other).apply(lib.GxB_ONE_BOOL, out=C)
-                return C
+            typ = types.promote(self.type, types._gb_from_type(type(other)))
+            self.apply_second(_get_bin_op(strop, typ), Scalar.from_value(other), out=C)
+            return C.select("!=0", out=C)
         elif isinstance(other, Vector):
-            A = self.full()
-            B = other.full()
-            A.emult(B, strop, out=C)
+            cmp_op = _get_bin_op(strop, types.promote(self.type, other.type))
+            self.emult(other, cmp_op, out=C)
+            if fill is not None:
+                fill = Scalar.from_value(fill)
+                self.apply_second(cmp_op, fill, out=C, mask=other, desc=descriptor.SC)
+                other.apply_first(fill, cmp_op, out=C, mask=self, desc=descriptor.SC)
             return C
         else:
             raise NotImplementedError
 
     def __gt__(self, other):
-        return self.compare(other, operator.gt, ">")
+        return self.compare(other, ">")
 
     def __lt__(self, other):
-        return self.compare(other, operator.lt, "<")
+        return self.compare(other, "<")
 
     def __ge__(self, other):
-        return self.compare(other, operator.ge, ">=")
+        return self.compare(other, ">=")
 
     def __le__(self, other):
-        return self.compare(other, operator.le, "<=")
+        return self.compare(other, "<=")
 
     def __eq__(self, other):
-        return self.compare(other, operator.eq, "==")
+        return self.compare(other, "==")
 
     def __ne__(self, other):
-        return self.compare(other, operator.ne, "!=")
+        return self.compare(other, "!=")
 
     def eadd(
         self,
@@ -394,12 +599,14 @@ class Vector:
         )
         return out
 
+    @deferrable
     def __matmul__(self, other):
         return self.vxm(other)
 
     def __imatmul__(self, other):
         return self.vxm(other, out=self)
 
+    @deferrable
     def __and__(self, other):
         mask, mon, accum, desc = self._get_args()
         return self.emult(other, mask=mask, accum=accum, desc=desc)
@@ -408,6 +615,7 @@ class Vector:
         mask, mon, accum, desc = self._get_args()
         return self.emult(other, mask=mask, accum=accum, desc=desc, out=self)
 
+    @deferrable
     def __or__(self, other):
         mask, mon, accum, desc = self._get_args()
         return self.eadd(other, mask=mask, accum=accum, desc=desc)
@@ -416,6 +624,7 @@ class Vector:
         mask, mon, accum, desc = self._get_args()
         return self.eadd(other, mask=mask, accum=accum, desc=desc, out=self)
 
+    @deferrable
     def __add__(self, other):
         mask, mon, accum, desc = self._get_args()
         if not isinstance(other, Vector):
@@ -424,6 +633,7 @@ class Vector:
             )
         return self.eadd(other, mask=mask, accum=accum, desc=desc)
 
+    @deferrable
     def __radd__(self, other):
         mask, mon, accum, desc = self._get_args()
         if not isinstance(other, Vector):
@@ -440,6 +650,7 @@ class Vector:
             )
         return self.eadd(other, out=self, mask=mask, accum=accum, desc=desc)
 
+    @deferrable
     def __sub__(self, other):
         mask, mon, accum, desc = self._get_args()
         if not isinstance(other, Vector):
@@ -450,6 +661,7 @@ class Vector:
             other, add_op=self.type.MINUS, mask=mask, accum=accum, desc=desc
         )
 
+    @deferrable
     def __rsub__(self, other):
         mask, mon, accum, desc = self._get_args()
         if not isinstance(other, Vector):
@@ -470,6 +682,7 @@ class Vector:
             self, out=self, add_op=self.type.MINUS, mask=mask, accum=accum, desc=desc
         )
 
+    @deferrable
     def __mul__(self, other):
         mask, mon, accum, desc = self._get_args()
         if not isinstance(other, Vector):
@@ -480,6 +693,7 @@ class Vector:
             other, add_op=self.type.TIMES, mask=mask, accum=accum, desc=desc
         )
 
+    @deferrable
     def __rmul__(self, other):
         mask, mon, accum, desc = self._get_args()
         if not isinstance(other, Vector):
@@ -500,6 +714,7 @@ class Vector:
             self, out=self, add_op=self.type.TIMES, mask=mask, accum=accum, desc=desc
         )
 
+    @deferrable
     def __truediv__(self, other):
         mask, mon, accum, desc = self._get_args()
         if not isinstance(other, Vector):
@@ -508,6 +723,7 @@ class Vector:
             )
         return self.eadd(other, add_op=self.type.DIV, mask=mask, accum=accum, desc=desc)
 
+    @deferrable
     def __rtruediv__(self, other):
         mask, mon, accum, desc = self._get_args()
         if not isinstance(other, Vector):
@@ -526,12 +742,15 @@ class Vector:
             self, out=self, add_op=self.type.DIV, mask=mask, accum=accum, desc=desc
         )
 
+    @deferrable
     def __invert__(self):
         return self.apply(unaryop.MINV)
 
+    @deferrable
     def __neg__(self):
         return self.apply(unaryop.AINV)
 
+    @deferrable
     def __abs__(self):
         return self.apply(unaryop.ABS)
 
@@ -540,6 +759,7 @@ class Vector:
 
     def resize(self, size):
         _check(lib.GrB_Vector_resize(self.vector[0], size))
+        self._size = size
 
     def _get_args(self, mask=NULL, accum=NULL, mon=NULL, desc=Default):
         if mon is NULL:
@@ -618,10 +838,11 @@ class Vector:
         if out is None:
             out = self.__class__.sparse(self.type, self.size)
         if isinstance(op, BinaryOp):
-            op = op.get_binaryop(self)
+            op = op.get_binaryop(self.type)
         mask, mon, accum, desc = self._get_args(**kwargs)
         if isinstance(first, Scalar):
             f = lib.GxB_Vector_apply_BinaryOp1st
+            first = first.scalar[0]
         else:
             f = self.type.Vector_apply_BinaryOp1st
         _check(f(out.vector[0], mask, accum, op, first, self.vector[0], desc))
@@ -634,10 +855,11 @@ class Vector:
         if out is None:
             out = self.__class__.sparse(self.type, self.size)
         if isinstance(op, BinaryOp):
-            op = op.get_binaryop(self)
+            op = op.get_binaryop(self.type)
         mask, mon, accum, desc = self._get_args(**kwargs)
         if isinstance(second, Scalar):
             f = lib.GxB_Vector_apply_BinaryOp2nd
+            second = second.scalar[0]
         else:
             f = self.type.Vector_apply_BinaryOp2nd
         _check(f(out.vector[0], mask, accum, op, self.vector[0], second, desc))
@@ -0,0 +1,113 @@
+import pytest
+from pygraphblas import *
+from pygraphblas import algorithms
+
+# 0 -> 1 -> 2 -> 3, 0 -> 4 -> 3, 5 -> 0, and 6 unreachable
+edges = [(0, 1), (1, 2), (2, 3), (0, 4), (4, 3), (5, 0)]
+
+
+def graph(typ=BOOL, values=None):
+    I, J = zip(*edges)
+    if values is None:
+        values = [typ.one] * len(edges)
+    return Matrix.from_lists(list(I), list(J), values, 7, 7, typ=typ)
+
+
+def test_bfs():
+    A = graph()
+    for kwargs in ({}, dict(alpha=1e-9), dict(alpha=1e9, beta=1e9)):
+        levels, parents = algorithms.bfs(A, 0, **kwargs)
+        assert parents is None
+        assert levels.to_lists() == [[0, 1, 2, 3, 4], [0, 1, 2, 2, 1]]
+        levels, parents = algorithms.bfs(A, 0, AT=A.T, parents=True, **kwargs)
+        assert levels.to_lists() == [[0, 1, 2, 3, 4], [0, 1, 2, 2, 1]]
+        assert parents.to_lists()[0] == [0, 1, 2, 3, 4]
+        assert parents[0] == 0
+        assert parents[1] == 0
+        assert parents[2] == 1
+        assert parents[3] in (2, 4)
+        assert parents[4] == 0
+
+
+def test_multi_source_bfs():
+    A = graph()
+    levels = algorithms.multi_source_bfs(A, [0, 5, 3, 0], batch=3)
+    assert levels.type == INT64
+    assert levels.shape == (4, 7)
+    for k, source in enumerate([0, 5, 3, 0]):
+        expected = algorithms.bfs(A, source)[0]
+        assert levels.extract_row(k).iseq(expected)
+
+
+def test_multi_source_sssp():
+    A = graph(FP64, [1.0, 1.0, 1.0, 5.0, 0.5, 2.0])
+    dist = algorithms.multi_source_sssp(A, [0, 5, 4], batch=2)
+    assert dist.type == FP64
+    assert dist.to_lists() == [
+        [0, 0, 0, 0, 0, 1, 1, 1, 1, 1, 1, 2, 2],
+        [0, 1, 2, 3, 4, 0, 1, 2, 3, 4, 5, 3, 4],
+        [0.0, 1.0, 2.0, 3.0, 5.0, 2.0, 3.0, 4.0, 5.0, 7.0, 0.0, 0.5, 0.0]]
+    hops = algorithms.multi_source_sssp(graph(), [0])
+    assert hops.type == INT64
+    assert hops.to_lists()[2] == [0, 1, 2, 2, 1]
+    A[3, 0] = -4.0
+    with pytest.raises(ValueError):
+        algorithms.multi_source_sssp(A, [0])
+
+
+def test_sssp():
+    A = graph(FP64, [1.0, 1.0, 1.0, 5.0, 0.5, 2.0])
+    for delta in (None, 0.25, 1.0, 10.0):
+        dist = algorithms.sssp(A, 0, delta)
+        assert dist.to_lists() == [[0, 1, 2, 3, 4], [0.0, 1.0, 2.0, 3.0, 5.0]]
+        dist = algorithms.sssp(A, 5, delta)
+        assert dist.to_lists() == [[0, 1, 2, 3, 4, 5], [2.0, 3.0, 4.0, 5.0, 7.0, 0.0]]
+    hops = algorithms.sssp(graph(), 0)
+    assert hops.type == INT64
+    assert hops.iseq(algorithms.bfs(graph(), 0)[0])
+    A[3, 0] = -1.0
+    with pytest.raises(ValueError):
+        algorithms.sssp(A, 0)
+
+
+def test_pagerank():
+    cycle = Matrix.from_lists([0, 1, 2], [1, 2, 0], [True] * 3)
+    ranks, iterations, residual = algorithms.pagerank(cycle)
+    assert iterations == 1
+    assert residual < 1e-12
+    assert all(abs(x - 1 / 3) < 1e-12 for x in ranks.to_lists()[1])
+
+    A = graph()
+    ranks, iterations, residual = algorithms.pagerank(A, tol=1e-8)
+    assert residual <= 1e-8
+    assert 1 < iterations < 100
+    assert ranks.nvals == 7
+    assert abs(ranks.reduce_float() - 1) < 1e-9
+    assert ranks[3] > ranks[2] > ranks[1] > ranks[6]
+
+    degrees = Vector.from_lists([0, 1, 2, 4, 5], [2, 1, 1, 1, 1], 7)
+    same, _, _ = algorithms.pagerank(A, tol=1e-8, out_degree=degrees)
+    assert same.iseq(ranks)
+
+    teleport = Vector.from_lists([5], [3], 7)
+    ranks, iterations, residual = algorithms.pagerank(
+        A, 0.5, teleport=teleport, typ=FP32, itermax=5)
+    assert ranks.type == FP32
+    assert iterations == 5
+    assert ranks.to_lists()[0] == [0, 1, 2, 3, 4, 5]
+
+
+def test_betweenness_centrality():
+    A = graph()
+    expected = [4.0, 2.0, 1.0, 0.0, 2.0, 0.0, 0.0]
+    for kwargs in ({}, dict(batch=2, nthreads=2), dict(batch=3, AT=A.T, nthreads=1)):
+        bc = algorithms.betweenness_centrality(A, range(7), **kwargs)
+        assert bc.type == FP64
+        assert bc.to_lists() == [list(range(7)), expected]
+    bc = algorithms.betweenness_centrality(A, [5], typ=FP32)
+    assert bc.type == FP32
+    assert bc.to_lists()[1] == [4.0, 1.0, 0.0, 0.0, 1.0, 0.0, 0.0]
+
+    diamond = Matrix.from_lists([0, 0, 1, 2], [1, 2, 3, 3], [True] * 4, 4, 4)
+    bc = algorithms.betweenness_centrality(diamond, [0, 1, 2, 3])
+    assert bc.to_lists()[1] == [0.0, 0.5, 0.5, 0.0]
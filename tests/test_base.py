@@ -6,3 +6,19 @@ def test_options_set():
     options_set(nthreads=4)
     options_set(chunk=4096)
     options_set(burble=1)
+
+def test_lazy_operators():
+    from pygraphblas import semiring, binaryop, monoid, unaryop
+    assert INT64.PLUS_TIMES is semiring.PLUS_TIMES_INT64
+    assert INT64.PLUS is binaryop.PLUS_INT64
+    assert INT64.PLUS_MONOID is monoid.PLUS_INT64_monoid
+    assert FP64.ABS is unaryop.ABS_FP64
+    assert isinstance(semiring.MIN_PLUS, semiring.AutoSemiring)
+    assert isinstance(binaryop.TIMES, binaryop.AutoBinaryOp)
+    assert isinstance(monoid.MAX_MONOID, monoid.AutoMonoid)
+    with pytest.raises(AttributeError):
+        semiring.NOT_A_SEMIRING
+    with pytest.raises(AttributeError):
+        INT64.NOT_AN_OP
+    assert not hasattr(INT64, "NOT_AN_OP")
+    assert INT64.PLUS is binaryop.PLUS_INT64
@@ -1,8 +1,13 @@
+import io
 import sys
+import gzip
+import pickle
 from operator import mod
 from itertools import product, repeat
+from array import array
 import re
 
+import numpy as np
 import pytest
 
 from pygraphblas import *
@@ -96,6 +101,71 @@ def test_matrix_to_from_lists():
         list(range(10)),
         ]
 
+def test_matrix_from_lists_buffers():
+    v = Matrix.from_lists(
+        array('L', range(10)),
+        np.arange(10, dtype=np.int32),
+        np.arange(10, dtype=np.float32))
+    assert v.type == FP32
+    assert v.shape == (10, 10)
+    assert v.to_lists() == [
+        list(range(10)),
+        list(range(10)),
+        list(map(float, range(10))),
+        ]
+
+def test_matrix_from_lists_dup_op():
+    v = Matrix.from_lists([0, 0, 1], [0, 0, 1], [1, 2, 3])
+    assert v.to_lists() == [[0, 1], [0, 1], [2, 3]]
+    v = Matrix.from_lists([0, 0, 1], [0, 0, 1], [1, 2, 3], dup_op=INT64.PLUS)
+    assert v.to_lists() == [[0, 1], [0, 1], [3, 3]]
+
+def test_matrix_csr_csc():
+    m = Matrix.from_lists([0, 0, 2], [1, 2, 0], [1.0, 2.0, 3.0], 3, 3)
+    indptr, indices, values = m.to_csr()
+    assert indptr.tolist() == [0, 2, 2, 3]
+    assert indices.tolist() == [1, 2, 0]
+    assert values.tolist() == [1.0, 2.0, 3.0]
+    assert m.nvals == 3
+    n = Matrix.from_csr(indptr, indices, values, ncols=3)
+    assert n.iseq(m)
+    indptr, indices, values = m.to_csc(move=True)
+    assert m.nvals == 0
+    assert m.shape == (3, 3)
+    assert indptr.tolist() == [0, 1, 2, 3]
+    assert indices.tolist() == [2, 0, 0]
+    assert Matrix.from_csc(indptr, indices, values, nrows=3).iseq(n)
+    with pytest.raises(ValueError):
+        Matrix.from_csr([0, 2, 2, 3], [1, 2, 0], [1.0, 2.0], ncols=3)
+    with pytest.raises(ValueError):
+        Matrix.from_csr([0, 2, 2, 4], [1, 2, 0], [1.0, 2.0, 3.0], ncols=3)
+    with pytest.raises(ValueError):
+        Matrix.from_csr([], [], [], ncols=3, typ=FP64)
+
+def test_matrix_hypersparse():
+    m = Matrix.from_lists([5, 5, 9], [1, 7, 0], [1, 2, 3], 10, 10)
+    rows, indptr, indices, values = m.to_hypercsr()
+    assert rows.tolist() == [5, 9]
+    assert indptr.tolist() == [0, 2, 3]
+    assert indices.tolist() == [1, 7, 0]
+    n = Matrix.from_hypercsr(rows, indptr, indices, values, 10, 10)
+    assert n.type == INT64
+    assert n.iseq(m)
+    with pytest.raises(ValueError):
+        Matrix.from_hypercsr(rows, indptr[1:], indices, values, 10, 10)
+
+def test_matrix_scipy():
+    sparse = pytest.importorskip("scipy.sparse")
+    sp = sparse.coo_matrix(([1.0, 2.0, 3.0], ([0, 0, 2], [1, 2, 0])), shape=(3, 4))
+    m = Matrix.from_scipy(sp)
+    assert m.shape == (3, 4)
+    assert m.to_lists() == [[0, 0, 2], [1, 2, 0], [1.0, 2.0, 3.0]]
+    assert Matrix.from_scipy(sp.tocsc()).iseq(m)
+    assert (m.to_scipy() != sp).nnz == 0
+    assert (m.to_scipy("csc") != sp).nnz == 0
+    n = Matrix.from_scipy(sp, typ=INT32)
+    assert n.type == INT32
+
 def test_matrix_gb_type():
     v = Matrix.sparse(BOOL, 10)
     assert v.gb_type == lib.GrB_BOOL
@@ -332,6 +402,110 @@ def test_matrix_mm_read_write(tmp_path):
         n = Matrix.from_mm(f, INT8)
     assert n.iseq(m)
 
+    with mmf.open() as f:
+        n = Matrix.from_mm(f)
+    assert n.type == INT64
+    assert n.iseq(m)
+
+def test_matrix_mm_read_path(tmp_path):
+    mmf = tmp_path / 'mmread_test.mtx'
+    mmf.write_text(
+        '%%MatrixMarket matrix coordinate real symmetric\n'
+        '% a comment\n'
+        '3 3 3\n'
+        '1 1 2.5\n'
+        '3 1 -1e-3\n'
+        '3 2 4\n')
+    n = Matrix.from_mm(mmf)
+    assert n.type == FP64
+    assert n.to_lists() == [
+        [0, 0, 1, 2, 2],
+        [0, 2, 2, 0, 1],
+        [2.5, -1e-3, 4.0, -1e-3, 4.0]]
+
+    mmf.write_text(
+        '%%MatrixMarket matrix coordinate pattern general\n'
+        '2 3 2\n'
+        '1 3\n'
+        '2 1\n')
+    n = Matrix.from_mm(str(mmf), nthreads=2)
+    assert n.type == BOOL
+    assert n.shape == (2, 3)
+    assert n.to_lists() == [[0, 1], [2, 0], [True, True]]
+
+    mmf.write_text(
+        '%%MatrixMarket matrix array integer skew-symmetric\n'
+        '3 3\n'
+        '1\n'
+        '2\n'
+        '3\n')
+    n = Matrix.from_mm(mmf, INT8)
+    assert n.type == INT8
+    assert n.to_lists() == [
+        [0, 0, 1, 1, 2, 2],
+        [1, 2, 0, 2, 0, 1],
+        [-1, -2, 1, -3, 2, 3]]
+
+    m = Matrix.from_lists([0, 1, 2], [0, 1, 2], [2, 3, 4])
+    with mmf.open('w') as f:
+        m.to_mm(f)
+    n = Matrix.from_mm(mmf)
+    assert n.type == INT64
+    assert n.iseq(m)
+
+def test_matrix_mm_write(tmp_path):
+    mmf = tmp_path / 'mmwrite_test.mtx'
+    m = Matrix.from_lists(
+        [0, 0, 1, 2],
+        [1, 2, 2, 0],
+        [0.1, -2.5, 1e-7, 3e20])
+    m.to_mm(mmf)
+    assert mmf.read_text().splitlines() == [
+        '%%MatrixMarket matrix coordinate real general',
+        '%%GraphBLAS GrB_FP64',
+        '3 3 4',
+        '1 2 0.1',
+        '1 3 -2.5',
+        '2 3 1e-7',
+        '3 1 3e20']
+    assert Matrix.from_mm(mmf).iseq(m)
+
+    m = Matrix.random(INT32, 50, 40, 300, seed=42)
+    m.to_mm(str(mmf), nthreads=2, max_nvals=64)
+    n = Matrix.from_mm(mmf)
+    assert n.type == INT32
+    assert n.iseq(m)
+
+    gzf = tmp_path / 'mmwrite_test.mtx.gz'
+    m.to_mm(gzf)
+    with gzip.open(gzf) as f:
+        assert f.read() == mmf.read_bytes()
+
+    buf = io.BytesIO()
+    m.to_mm(buf)
+    assert buf.getvalue() == mmf.read_bytes()
+
+def test_matrix_mm_integer_limits(tmp_path):
+    mmf = tmp_path / 'limits.mtx'
+    for typ, values in ((INT64, [-2**63, 2**63 - 1, 0]),
+                        (UINT64, [2**64 - 1, 2**63, 0])):
+        m = Matrix.from_lists([0, 1, 2], [0, 1, 2], values, 3, 3, typ=typ)
+        m.to_mm(mmf)
+        n = Matrix.from_mm(mmf)
+        assert n.type == typ
+        assert n.iseq(m)
+
+    mmf.write_text(
+        '%%MatrixMarket matrix coordinate integer general\n'
+        '2 2 2\n1 1 1\n2 2 9223372036854775808\n')
+    with pytest.raises(ValueError, match='line 4'):
+        Matrix.from_mm(mmf)
+    mmf.write_text(
+        '%%MatrixMarket matrix coordinate real general\n'
+        '2 2 2\n1 1 1.5\n2 2 1.5.5\n')
+    with pytest.raises(ValueError, match='line 4'):
+        Matrix.from_mm(mmf)
+
 def test_matrix_binfile_read_write(tmp_path):
     binfilef = tmp_path / 'binfilewrite_test.binfile'
     binfilef.touch()
@@ -343,6 +517,96 @@ def test_matrix_binfile_read_write(tmp_path):
     n = Matrix.from_binfile(bytes(binfilef))
     assert n.iseq(m)
 
+def test_matrix_mapfile(tmp_path):
+    from pygraphblas import binio
+    path = tmp_path / 'matrix.gbm'
+    m = Matrix.from_lists([0, 0, 2], [1, 2, 0], [1.0, 2.0, 3.0], 3, 4)
+    m.to_mapfile(path)
+    n = Matrix.from_mapfile(path)
+    assert n.type == FP64
+    assert n.shape == (3, 4)
+    assert n.iseq(m)
+
+    with binio.MapFile(path) as mf:
+        assert mf.shape == (3, 4)
+        assert mf.nvals == 3
+        assert mf.layout == binio.CSR
+        h, p, i, x = mf.arrays
+        assert p.tolist() == [0, 2, 2, 3]
+        assert x.tolist() == [1.0, 2.0, 3.0]
+        del h, p, i, x
+
+    m = Matrix.from_lists([5, 5, 9], [1, 7, 0], [True, False, True], 10, 10)
+    m.options_set(hyper=1.0)
+    m.to_mapfile(str(path))
+    n = Matrix.from_mapfile(str(path))
+    assert n.type == BOOL
+    assert n.iseq(m)
+
+    path.write_bytes(b'not a matrix')
+    with pytest.raises(ValueError):
+        Matrix.from_mapfile(path)
+
+    m.to_mapfile(path)
+    data = bytearray(path.read_bytes())
+    data[16:32] = b'Matrix'.ljust(16, b'\0')
+    path.write_bytes(bytes(data))
+    with pytest.raises(ValueError):
+        Matrix.from_mapfile(path)
+
+def test_matrix_blockfile(tmp_path):
+    path = tmp_path / 'matrix.gbz'
+    m = Matrix.from_lists(
+        [0, 0, 2, 3, 3], [1, 2, 0, 1, 3], [1.0, 2.0, 3.0, 4.0, 5.0], 4, 5)
+    for codec in ('zlib', 'lzma', None):
+        m.to_blockfile(path, codec, block_size=2, nthreads=2)
+        n = Matrix.from_blockfile(path, nthreads=2)
+        assert n.type == FP64
+        assert n.shape == (4, 5)
+        assert n.iseq(m)
+
+    m.to_blockfile(path, 'zlib', level=9)
+    assert Matrix.from_blockfile(path).iseq(m)
+
+    v = Vector.from_lists([1, 3], [True, False], 5)
+    v.to_blockfile(path)
+    with pytest.raises(TypeError):
+        Matrix.from_blockfile(path)
+
+    vgood = path.read_bytes()
+    m.to_blockfile(path, 'zlib', block_size=2)
+    good = path.read_bytes()
+    for data, start, stop, patch in (
+        (good, 20, 24, b'\x07\0\0\0'),
+        (good, 24, 40, b'Matrix'.ljust(16, b'\0')),
+        (good, len(good) - 8, len(good), b''),
+        (good, len(good) - 8, len(good), b'\xff' * 8),
+        (vgood, 96, 104, (1).to_bytes(8, 'little')),
+    ):
+        path.write_bytes(data[:start] + patch + data[stop:])
+        with pytest.raises(ValueError):
+            Matrix.from_blockfile(path)
+
+def test_matrix_pickle():
+    m = Matrix.from_lists([0, 0, 2], [1, 2, 0], [1.0, 2.0, 3.0], 3, 4)
+    for protocol in range(2, pickle.HIGHEST_PROTOCOL + 1):
+        n = pickle.loads(pickle.dumps(m, protocol))
+        assert n.type == FP64
+        assert n.shape == (3, 4)
+        assert n.iseq(m)
+
+    buffers = []
+    data = pickle.dumps(m, 5, buffer_callback=buffers.append)
+    assert len(buffers) == 4
+    n = pickle.loads(data, buffers=buffers)
+    assert n.iseq(m)
+
+    m = Matrix.from_lists([5, 5, 9], [1, 7, 0], [True, False, True], 10, 10)
+    m.options_set(hyper=1.0)
+    n = pickle.loads(pickle.dumps(m))
+    assert n.type == BOOL
+    assert n.iseq(m)
+
 def test_matrix_tsv_read(tmp_path):
     mmf = tmp_path / 'tsv_test.mm'
     mmf.touch()
@@ -360,6 +624,33 @@ def test_matrix_tsv_read(tmp_path):
         [0, 1, 2],
         [2, 3, 4]]
 
+    n = Matrix.from_tsv(mmf, INT8, 3, 3)
+    assert n.to_lists() == [
+        [0, 1, 2],
+        [0, 1, 2],
+        [2, 3, 4]]
+
+def test_matrix_edgelist_read(tmp_path):
+    csv = tmp_path / 'edges.csv'
+    csv.write_text(
+        'src,dst,weight\n'
+        '# a comment\n'
+        '0,2,1.5\n'
+        '3,1,-2\n'
+        '0,2,1\n')
+    n = Matrix.from_edgelist(
+        csv, columns=(1, 0, 2), base=0, delimiter=',', skiprows=1,
+        dup_op=FP64.PLUS)
+    assert n.type == FP64
+    assert n.shape == (3, 4)
+    assert n.to_lists() == [[1, 2], [3, 0], [-2.0, 2.5]]
+
+    n = Matrix.from_edgelist(
+        csv, INT32, 4, 4, columns=(0, 1), base=0, delimiter=',',
+        skiprows=1, nthreads=2)
+    assert n.shape == (4, 4)
+    assert n.to_lists() == [[0, 3], [2, 1], [1, 1]]
+
 def test_matrix_random():
     m = Matrix.random(INT8, 10, 10, 5, seed=42)
     assert m.nrows == 10
@@ -811,6 +1102,35 @@ def test_to_arrays():
     assert len(X) == 100
     assert all(x == 0 for x in X)
 
+def test_matrix_from_arrow_columns():
+    table = {
+        'src': array('i', [0, 1, 2]),
+        'dst': np.array([1, 2, 0], dtype=np.uint32),
+        'w': np.array([0.5, 1.5, 2.5])}
+    m = Matrix.from_arrow(table, 'src', 'dst', 'w')
+    assert m.type == FP64
+    assert m.to_lists() == [[0, 1, 2], [1, 2, 0], [0.5, 1.5, 2.5]]
+    m = Matrix.from_arrow(table, 'src', 'dst', None, 4, 4)
+    assert m.type == BOOL
+    assert m.shape == (4, 4)
+    assert m.to_lists() == [[0, 1, 2], [1, 2, 0], [True, True, True]]
+
+def test_matrix_arrow():
+    pa = pytest.importorskip("pyarrow")
+    table = pa.table({
+        'row': pa.chunked_array([[0, 1], [2, 2]], pa.int32()),
+        'col': pa.array([1, 2, 0, 3], pa.int64()),
+        'value': pa.array([1, 2, None, 4], pa.int16())})
+    with pytest.raises(ValueError):
+        Matrix.from_arrow(table)
+    m = Matrix.from_arrow(table.slice(1).drop_null())
+    assert m.type == INT16
+    assert m.to_lists() == [[1, 2], [2, 3], [2, 4]]
+    t = m.to_arrow(names=('i', 'j', 'x'))
+    assert t.column_names == ['i', 'j', 'x']
+    assert t['x'].to_pylist() == [2, 4]
+    assert Matrix.from_arrow(t, 'i', 'j', 'x').iseq(m)
+
 def test_pow():
     m = Matrix.dense(UINT8, 10, 10)
     assert m.identity(UINT8, 10) == m ** 0
@@ -819,6 +1139,22 @@ def test_pow():
     vals = (m ** 3).to_arrays()[2]
     assert (x == 100 for x in vals)
 
+def test_power():
+    A = Matrix.from_lists([0, 1, 2], [1, 2, 3], [1, 1, 1], 4, 4)
+    assert A.power(5).iseq(A @ A @ A @ A @ A)
+    assert (A ** 3).iseq(Matrix.from_lists([0], [3], [1], 4, 4))
+    M = Matrix.from_lists([0], [2], [True], 4, 4)
+    assert A.power(2, mask=M).iseq(Matrix.from_lists([0], [2], [1], 4, 4))
+    assert A.power(3, mask=M).nvals == 0
+    assert A.power(1, mask=M).nvals == 0
+    B = A + A.transpose()
+    assert B.power(4, mask=M).iseq(Matrix.from_lists([0], [2], [3], 4, 4))
+
+    R = A.cast(BOOL) + Matrix.identity(BOOL, 4)
+    closure = R.power(100, semiring=BOOL.LOR_LAND, early_exit=True)
+    assert closure.iseq(R.power(100, semiring=BOOL.LOR_LAND))
+    assert closure.nvals == 10
+
 def test_T():
     m = Matrix.dense(UINT8, 10, 10)
     assert m.T == m.transpose()
@@ -985,3 +1321,125 @@ def test_promotion():
     )
     o = m @ n
     assert o.type == INT8
+
+def test_matrix_deferred():
+    A = Matrix.from_lists([0, 1, 2], [1, 2, 0], [1, 2, 3])
+    B = Matrix.from_lists([0, 1, 2], [0, 1, 2], [4, 5, 6])
+    C = Matrix.from_lists([0, 0, 2], [0, 1, 2], [1, 1, 1])
+    with Deferred():
+        e = A @ B + C * 2
+    assert isinstance(e, Expr)
+    assert e.eval().iseq(A @ B + C * 2)
+    assert (lazy(A) @ B - C).eval().iseq(A @ B - C)
+
+    M = Matrix.from_lists([0, 2], [1, 0], [True, True])
+    out = Matrix.sparse(INT64, 3, 3)
+    (lazy(A) @ B + C).eval(out=out, mask=M)
+    assert out.iseq(Matrix.from_lists([0, 2], [1, 0], [6, 12]))
+    assert lazy(A).eval(mask=M).iseq(Matrix.from_lists([0, 2], [1, 0], [1, 3], 3, 3))
+
+    # shared subexpressions are evaluated once
+    P = lazy(A) @ B
+    assert (P + P * 2).eval().iseq((A @ B) * 3)
+
+    out = C.dup()
+    with Accum(INT64.PLUS):
+        (lazy(A) @ B).eval(out=out)
+    assert out.iseq(C + A @ B)
+
+    # the output may also be an operand
+    D = A.dup()
+    (lazy(D) @ B + D).eval(out=D)
+    assert D.iseq(A @ B + A)
+    assert A.iseq(Matrix.from_lists([0, 1, 2], [1, 2, 0], [1, 2, 3]))
+
+def test_cmp_fill():
+    m = Matrix.from_lists([0, 0], [0, 1], [1, 2], 2, 2)
+    n = Matrix.from_lists([0, 1], [0, 1], [1, 3], 2, 2)
+    assert (m == n).iseq(Matrix.from_lists([0], [0], [True], 2, 2))
+    o = m.compare(n, "<", fill=0)
+    assert o.iseq(Matrix.from_lists(
+        [0, 0, 1],
+        [0, 1, 1],
+        [False, False, True]))
+
+def test_cmp_scalar_select():
+    m = Matrix.from_lists([0, 0, 1], [0, 1, 1], [1, 2, 3], 2, 2)
+    assert (m < 2.5).iseq(Matrix.from_lists([0, 0], [0, 1], [True, True], 2, 2))
+    assert (m > 2).iseq(Matrix.from_lists([1], [1], [True], 2, 2))
+    assert (m > 3).nvals == 0
+
+def test_transpose_cache():
+    m = Matrix.from_lists([0, 1], [1, 2], [1, 2], 3, 3)
+    assert m.T is not m.T
+    m.options_set(cache_transpose=True)
+    T = m.T
+    assert m.T is T
+    assert T.iseq(m.transpose())
+
+    m[2, 0] = 3
+    assert m.T is not T
+    assert m.T.iseq(m.transpose())
+
+    T = m.T
+    m += m
+    assert m.T is not T
+    T = m.T
+    m.apply(unaryop.AINV, out=m)
+    assert m.T is not T
+    T = m.T
+    m.resize(4, 4)
+    assert m.T.shape == (4, 4)
+
+    # writing to the cached transpose drops it from the cache
+    T = m.T
+    T[3, 3] = 1
+    assert m.T is not T
+    assert m.T.iseq(m.transpose())
+
+    limit = Matrix.transpose_cache_limit
+    Matrix.transpose_cache_limit = 1
+    try:
+        assert m.T is not m.T
+    finally:
+        Matrix.transpose_cache_limit = limit
+
+def test_matrix_to_numpy():
+    m = Matrix.from_lists([0, 1, 2], [1, 2, 0], [1.0, 2.0, 3.0])
+    I, J, X = m.to_numpy()
+    assert I.tolist() == [0, 1, 2]
+    assert J.tolist() == [1, 2, 0]
+    assert X.dtype == np.float64
+    assert X.tolist() == [1.0, 2.0, 3.0]
+    I, J, X = m.to_numpy(rows=False, vals=False)
+    assert I is None and X is None
+    assert J.tolist() == [1, 2, 0]
+    assert list(m) == [(0, 1, 1.0), (1, 2, 2.0), (2, 0, 3.0)]
+    assert list(m._iter_batches(2)) == list(m)
+    batches = list(m.iterbatches(2))
+    assert [len(b[0]) for b in batches] == [2, 1]
+    assert np.concatenate([b[2] for b in batches]).tolist() == [1.0, 2.0, 3.0]
+
+def test_matrix_iterblocks():
+    I = [0, 0, 1, 3, 3, 3, 5]
+    J = [1, 4, 2, 0, 1, 5, 5]
+    m = Matrix.from_lists(I, J, list(range(7)), 6, 6)
+    assert m.row_degrees().tolist() == [2, 1, 0, 3, 0, 1]
+    blocks = list(m.iterblocks(3))
+    assert [b[0].tolist() for b in blocks] == [[0, 0, 1], [3, 3, 3], [5]]
+    assert np.concatenate([b[1] for b in blocks]).tolist() == J
+    assert np.concatenate([b[2] for b in blocks]).tolist() == list(range(7))
+    assert sum(len(b[0]) for b in m.iterblocks(1)) == 7
+
+    m.options_set(format=lib.GxB_BY_COL)
+    assert m.row_degrees().tolist() == [2, 1, 0, 3, 0, 1]
+    blocks = list(m.iterblocks(3))
+    assert [sorted(b[1].tolist()) for b in blocks] == [[0, 1, 1], [2, 4], [5, 5]]
+    tuples = zip(*(np.concatenate(a).tolist() for a in zip(*blocks)))
+    assert sorted(tuples) == sorted(zip(I, J, range(7)))
+
+    n = 2**40
+    h = Matrix.from_lists([5, n - 1], [n - 1, 2], [1, 2], n, n)
+    blocks = list(h.iterblocks())
+    assert [b[0].tolist() for b in blocks] == [[5, n - 1]]
+    assert blocks[0][1].tolist() == [n - 1, 2]
@@ -1,4 +1,5 @@
 
+import pickle
 import pytest
 from pygraphblas import *
 from pygraphblas.base import lib
@@ -49,3 +50,10 @@ def test_scalar_clear():
 def test_scalar_wait():
     s = Scalar.from_value(2)
     s.wait()
+
+def test_scalar_pickle():
+    s = pickle.loads(pickle.dumps(Scalar.from_value(2)))
+    assert s.nvals == 1
+    assert s[0] == 2
+    s = pickle.loads(pickle.dumps(Scalar.from_type(FP64)))
+    assert s.nvals == 0
@@ -1,7 +1,9 @@
 import sys
+import pickle
 from itertools import repeat
 from array import array
 import re
+import numpy as np
 import pytest
 
 from pygraphblas import *
@@ -59,6 +61,35 @@ def test_vector_create_dup():
     assert n.nvals == 1
     assert n[3] == 3
 
+def test_vector_from_lists_buffers():
+    v = Vector.from_lists(array('L', [1, 3, 3]), np.array([1.0, 2.0, 3.0]))
+    assert v.type == FP64
+    assert v.size == 4
+    assert v.to_lists() == [[1, 3], [1.0, 3.0]]
+    v = Vector.from_lists([1, 3, 3], [1, 2, 3], dup_op=INT64.PLUS)
+    assert v.to_lists() == [[1, 3], [1, 5]]
+
+def test_vector_from_list_buffer():
+    v = Vector.from_list(np.arange(10, dtype=np.int16))
+    assert v.type == INT16
+    assert v.nvals == 10
+    assert v.to_lists() == [list(range(10)), list(range(10))]
+
+def test_vector_import_export():
+    v = Vector.from_buffers(np.array([1, 4]), np.array([2.0, 3.0]), 5)
+    assert v.type == FP64
+    assert v.size == 5
+    assert v.to_lists() == [[1, 4], [2.0, 3.0]]
+    I, X = v.export()
+    assert I.tolist() == [1, 4]
+    assert X.tolist() == [2.0, 3.0]
+    assert v.nvals == 0
+    assert v.size == 5
+    with pytest.raises(ValueError):
+        Vector.from_buffers(np.array([1]), np.array([2.0, 3.0]), 5)
+    with pytest.raises(ValueError):
+        Vector.from_buffers(np.array([1, 5]), np.array([2.0, 3.0]), 5)
+
 def test_vector_from_list():
     v = Vector.from_list(list(range(10)))
     assert v.size == 10
@@ -469,3 +500,66 @@ def test_itruediv_scalar():
     )
     m /= 3
     assert m.to_lists() ==  [[0, 1], [5, 1]]
+
+def test_vector_cmp_fill():
+    v = Vector.from_lists([0, 1], [1, 2], 3)
+    w = Vector.from_lists([0, 2], [1, 3], 3)
+    assert (v == w).iseq(Vector.from_lists([0], [True], 3))
+    assert v.compare(w, "!=", fill=0).iseq(
+        Vector.from_lists([0, 1, 2], [False, True, True]))
+    assert (v < 1.5).iseq(Vector.from_lists([0], [True], 3))
+    assert (v >= 1).nvals == 2
+
+def test_vector_deferred():
+    v = Vector.from_lists([0, 1, 2], [1, 2, 3], 3)
+    w = Vector.from_lists([0, 2], [4, 5], 3)
+    A = Matrix.from_lists([0, 1, 2], [1, 2, 0], [1, 2, 3])
+    with Deferred():
+        e = v @ A + w
+    assert isinstance(e, Expr)
+    assert e.eval().iseq(v @ A + w)
+
+    s = lazy(v) + w
+    assert (s * s - s).eval().iseq((v + w) * (v + w) - (v + w))
+
+    m = Vector.from_lists([1], [True], 3)
+    out = Vector.sparse(INT64, 3)
+    (lazy(v) + w).eval(out=out, mask=m)
+    assert out.iseq(Vector.from_lists([1], [2], 3))
+
+    out = v.dup()
+    with Accum(INT64.PLUS):
+        (lazy(w) * 2).eval(out=out)
+    assert out.iseq(Vector.from_lists([0, 1, 2], [9, 2, 13]))
+
+def test_vector_to_numpy():
+    v = Vector.from_lists([1, 3, 4], [True, False, True], 5)
+    I, X = v.to_numpy()
+    assert I.tolist() == [1, 3, 4]
+    assert X.dtype == np.bool_
+    assert list(v) == [(1, True), (3, False), (4, True)]
+    assert list(v._iter_batches(2)) == list(v)
+    assert [b[0].tolist() for b in v.iterbatches(2)] == [[1, 3], [4]]
+
+def test_vector_pickle():
+    v = Vector.from_lists([1, 3, 4], [1.5, 2.5, 3.5], 6)
+    for protocol in range(2, pickle.HIGHEST_PROTOCOL + 1):
+        w = pickle.loads(pickle.dumps(v, protocol))
+        assert w.type == FP64
+        assert w.size == 6
+        assert w.iseq(v)
+
+    buffers = []
+    data = pickle.dumps(v, 5, buffer_callback=buffers.append)
+    assert len(buffers) == 2
+    assert pickle.loads(data, buffers=buffers).iseq(v)
+
+def test_vector_blockfile(tmp_path):
+    path = tmp_path / 'vector.gbz'
+    v = Vector.from_lists([1, 3, 4, 9], [1, -2, 3, -4], 12)
+    for codec in ('zlib', 'lzma', None):
+        v.to_blockfile(path, codec, block_size=3)
+        w = Vector.from_blockfile(path)
+        assert w.type == INT64
+        assert w.size == 12
+        assert w.iseq(v)